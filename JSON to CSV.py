@@ -1,8 +1,32 @@
 import os
-import json
 import csv
+import orjson
 import argparse
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+# Number of threads parsing country files in parallel
+PARSE_WORKERS = 8
+
+# Display names derived from raw market keys, filled on first sight of each market
+_HCAP_CACHE: Dict[str, str] = {}
+_MARKET_CACHE: Dict[str, str] = {}
+
+
+def _hcap_name(market: str) -> str:
+    """Display name for a handicap market key, e.g. 'home_handicap_-1.5_odd' -> 'home handicap -1.5'"""
+    name = _HCAP_CACHE.get(market)
+    if name is None:
+        name = _HCAP_CACHE.setdefault(market, market.replace("_odd", "").replace("_", " "))
+    return name
+
+
+def _market_name(market: str) -> str:
+    """Display name for a generic market key, e.g. 'over_2.5_odd' -> 'over_2.5'"""
+    name = _MARKET_CACHE.get(market)
+    if name is None:
+        name = _MARKET_CACHE.setdefault(market, market.replace("_odd", ""))
+    return name
 
 
 def convert_arbitrage_to_csv(
@@ -41,81 +65,62 @@ def convert_arbitrage_to_csv(
     print(f"🔍 Scanning for arbitrage opportunities in '{input_dir}'...")
 
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
 
     all_opportunities = []
+    # Insertion-ordered union of every row's keys, used to build the CSV header
+    seen_keys: Dict[str, None] = {}
     country_counts = {}
     errors = []
 
     # Function to process files in a directory
     def process_directory(dir_path):
-        if not os.path.exists(dir_path):
+        try:
+            with os.scandir(dir_path) as it:
+                entries = [entry for entry in it if entry.is_file() and entry.name.lower().endswith('.json')]
+        except FileNotFoundError:
             print(f"⚠️ Directory '{dir_path}' does not exist.")
             return
 
-        for file_name in os.listdir(dir_path):
-            if not file_name.lower().endswith('.json'):
-                continue
-
-            country = os.path.splitext(file_name)[0]
-
-            # Apply country filter if specified
-            if filter_country and filter_country.lower() != country.lower():
-                continue
-
-            file_path = os.path.join(dir_path, file_name)
+        # Apply country filter if specified
+        if filter_country:
+            entries = [entry for entry in entries
+                       if os.path.splitext(entry.name)[0].lower() == filter_country.lower()]
 
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                    # Handle new structure - data is now a list of group objects
-                    total_opportunities_in_file = 0
-
-                    if isinstance(data, list):
-                        for group in data:
-                            if isinstance(group, dict) and "opportunities" in group:
-                                opportunities_list = group["opportunities"]
-
-                                # Only process the first opportunity from each group
-                                if opportunities_list and len(opportunities_list) > 0:
-                                    first_opp = opportunities_list[0]
-
-                                    # Skip if it doesn't meet arbitrage percentage filters
-                                    arb_pct = first_opp.get("arbitrage_percentage", 0)
-                                    if (min_arb_percentage is not None and arb_pct < min_arb_percentage or
-                                            max_arb_percentage is not None and arb_pct > max_arb_percentage):
-                                        continue
-
-                                    # Process the opportunity, passing the group data for match info
-                                    processed_opp = process_opportunity_with_group(first_opp, group, country)
-                                    all_opportunities.append(processed_opp)
-                                    total_opportunities_in_file += 1
-                            else:
-                                print(f"⚠️ Unexpected group structure in {file_name}")
-                    else:
-                        print(f"⚠️ Expected list structure in {file_name}, got {type(data)}")
-
-                    # Track opportunities by country
-                    country_counts[country] = country_counts.get(country, 0) + total_opportunities_in_file
-
-            except Exception as e:
-                error_msg = f"Error processing {file_name}: {str(e)}"
-                errors.append(error_msg)
-                print(f"❌ {error_msg}")
+        # Files are parsed in parallel; results are merged here so no locking is needed
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            results = executor.map(
+                lambda entry: parse_arbitrage_file(entry.path, min_arb_percentage, max_arb_percentage),
+                entries
+            )
+            for entry, (rows, warnings, error) in zip(entries, results):
+                for warning in warnings:
+                    print(f"⚠️ {warning}")
+                if error:
+                    error_msg = f"Error processing {entry.name}: {error}"
+                    errors.append(error_msg)
+                    print(f"❌ {error_msg}")
+                    continue
+
+                country = os.path.splitext(entry.name)[0]
+                all_opportunities.extend(rows)
+                for row in rows:
+                    seen_keys.update(dict.fromkeys(row))
+
+                # Track opportunities by country
+                country_counts[country] = country_counts.get(country, 0) + len(rows)
 
     # Process files based on sport selection
     if sport == 'all':
         # Process all subdirectories in the mode directory
-        if os.path.exists(input_dir):
-            for sport_dir in os.listdir(input_dir):
-                sport_path = os.path.join(input_dir, sport_dir)
-                if os.path.isdir(sport_path):
-                    process_directory(sport_path)
-        else:
+        try:
+            with os.scandir(input_dir) as it:
+                sport_paths = [entry.path for entry in it if entry.is_dir()]
+        except FileNotFoundError:
             print(f"⚠️ Base directory '{input_dir}' does not exist.")
             return
+        for sport_path in sport_paths:
+            process_directory(sport_path)
     else:
         # Process specific sport directory
         process_directory(input_dir)
@@ -136,18 +141,15 @@ def convert_arbitrage_to_csv(
             )
 
     # Get the fieldnames in the desired order
-    fieldnames = create_ordered_fieldnames(all_opportunities)
+    fieldnames = create_ordered_fieldnames(seen_keys)
 
     # Write to CSV
     if all_opportunities:
         with open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for row in all_opportunities:
-                # Ensure all fields are included, with empty strings for missing values
-                writer_row = {field: row.get(field, "") for field in fieldnames}
-                writer.writerow(writer_row)
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            # Ensure all fields are included, with empty strings for missing values
+            writer.writerows([row.get(field, "") for field in fieldnames] for row in all_opportunities)
 
         # Generate summary
         total_count = len(all_opportunities)
@@ -174,6 +176,60 @@ def convert_arbitrage_to_csv(
         print(f"\n⚠️ Encountered {len(errors)} errors during processing.")
 
 
+def parse_arbitrage_file(
+        file_path: str,
+        min_arb_percentage: Optional[float] = None,
+        max_arb_percentage: Optional[float] = None,
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
+    """
+    Parse one country's arbitrage JSON file into processed CSV rows
+
+    Args:
+        file_path: Path to the country JSON file
+        min_arb_percentage: Optional minimum arbitrage percentage filter
+        max_arb_percentage: Optional maximum arbitrage percentage filter
+
+    Returns:
+        A (rows, warnings, error) tuple; error is None when the file was parsed
+    """
+    file_name = os.path.basename(file_path)
+    country = os.path.splitext(file_name)[0]
+    rows = []
+    warnings = []
+
+    try:
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
+
+        # Handle new structure - data is now a list of group objects
+        if isinstance(data, list):
+            for group in data:
+                if isinstance(group, dict) and "opportunities" in group:
+                    opportunities_list = group["opportunities"]
+
+                    # Only process the first opportunity from each group
+                    if opportunities_list and len(opportunities_list) > 0:
+                        first_opp = opportunities_list[0]
+
+                        # Skip if it doesn't meet arbitrage percentage filters
+                        arb_pct = first_opp.get("arbitrage_percentage", 0)
+                        if (min_arb_percentage is not None and arb_pct < min_arb_percentage or
+                                max_arb_percentage is not None and arb_pct > max_arb_percentage):
+                            continue
+
+                        # Process the opportunity, passing the group data for match info
+                        rows.append(process_opportunity_with_group(first_opp, group, country))
+                else:
+                    warnings.append(f"Unexpected group structure in {file_name}")
+        else:
+            warnings.append(f"Expected list structure in {file_name}, got {type(data)}")
+
+    except Exception as e:
+        return [], warnings, str(e)
+
+    return rows, warnings, None
+
+
 def process_opportunity_with_group(opp: Dict[str, Any], group: Dict[str, Any], country: str) -> Dict[str, Any]:
     """
     Process an arbitrage opportunity with group information into a structured format
@@ -242,13 +298,11 @@ def process_opportunity_with_group(opp: Dict[str, Any], group: Dict[str, Any], c
         # Extract handicap values and process accordingly
         for market, odds_data in best_odds.items():
             if "handicap" in market:
-                # Clean up the market name for display
-                display_name = market.replace("_odd", "").replace("_", " ")
-                process_odds_pair(row, best_odds, market, display_name)
+                process_odds_pair(row, best_odds, market, _hcap_name(market))
     else:
         # Generic processing for any other markets
         for market, odds_data in best_odds.items():
-            process_odds_pair(row, best_odds, market, market.replace("_odd", ""))
+            process_odds_pair(row, best_odds, market, _market_name(market))
 
     return row
 
@@ -312,7 +366,7 @@ def process_opportunity(opp: Dict[str, Any], country: str) -> Dict[str, Any]:
     else:
         # Generic processing for any other markets
         for market, odds_data in best_odds.items():
-            process_odds_pair(row, best_odds, market, market.replace("_odd", ""))
+            process_odds_pair(row, best_odds, market, _market_name(market))
 
     # Add sources information
     sources = match_info.get("all_sources", [])
@@ -344,24 +398,20 @@ def process_odds_pair(row: Dict[str, Any], best_odds: Dict[str, Any], odds_key:
             row[f"{display_name}_source"] = odds_data[1]
 
 
-def create_ordered_fieldnames(opportunities: List[Dict[str, Any]]) -> List[str]:
+def create_ordered_fieldnames(keys: Iterable[str]) -> List[str]:
     """
     Create an ordered list of fieldnames for the CSV
 
     Args:
-        opportunities: The list of processed opportunities
+        keys: The union of keys across all processed opportunities
 
     Returns:
         An ordered list of fieldnames
     """
-    if not opportunities:
+    all_keys = set(keys)
+    if not all_keys:
         return []
 
-    # Find all unique keys across opportunities
-    all_keys = set()
-    for opp in opportunities:
-        all_keys.update(opp.keys())
-
     # Define column order priority
     primary_columns = [
         "country", "date", "time", "home_team", "away_team",
@@ -2,17 +2,28 @@
 
 import re
 import os
+import time
+import queue
+import atexit
+import functools
+import logging
 import itertools
-from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple, Set
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple, Set
 from urllib.parse import quote
-import json
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
 # ─── Placeholder for football market sets ───────────────────────────────────────
 # `main.py` will assign this to the "market_sets" dict loaded from {SPORT}/markets.json.
-MARKET_SETS: Dict[str, List[str]] = {}
+MARKET_SETS: Dict[str, Tuple[str, ...]] = {}
 
 # ─── Placeholders for URL building ───────────────────────────────────────────────
 # `main.py` will load these from settings/url_builder.json
@@ -24,9 +35,61 @@ APPEARANCE_INVESTIGATION_LOGGING: bool = False
 LOG_OUTPUT_ROOT: str = ""
 FULL_CHECK_MARKETS: Set[str] = set()
 
+# ─── Source interning ─────────────────────────────────────────────────────────
+class _SourceRegistry:
+    """
+    Interns source names to small integer ids, stable for the life of the process.
+    Internal hot paths work on ids (and `1 << id` bitmasks); names are only looked up
+    again when an opportunity is serialized.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def sid(self, name: str) -> int:
+        source_id = self._ids.get(name)
+        if source_id is None:
+            with self._lock:
+                source_id = self._ids.get(name)
+                if source_id is None:
+                    source_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = source_id
+        return source_id
+
+    def sname(self, source_id: int) -> str:
+        return self._names[source_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+SOURCE_REGISTRY = _SourceRegistry()
+sid = SOURCE_REGISTRY.sid
+sname = SOURCE_REGISTRY.sname
+
+# ─── Per-source URL builders, see build_url_builders() ─────────────────────
+_URL_BUILDERS: Dict[str, Callable[..., str]] = {}
+
 # ─── Global for Market Categories ──────────────────────────────────────────
 MARKET_CATEGORIES: Dict[str, str] = {}
 
+# Market-set name -> category, exact names first, then substring rules in priority order
+EXACT_MARKET_CATEGORIES: Dict[str, str] = {
+    "three_way": "3-way",
+    "one_vs_x2": "double-chance",
+    "two_vs_1x": "double-chance",
+    "x_vs_12": "double-chance",
+    "both_score": "btts",
+}
+PREFIX_MARKET_CATEGORIES: Tuple[Tuple[str, str], ...] = (
+    ("under_", "totals"),
+    ("over_", "totals"),
+    ("ah_", "handicap"),
+)
+
 
 # ─── Function to Build Market Categories ──────────────────────────────────
 def build_market_categories():
@@ -38,24 +101,17 @@ def build_market_categories():
     if MARKET_CATEGORIES:
         return
 
-    cat_map = {}
-    for set_name, keys in MARKET_SETS.items():
-        category = None
-        if "under_" in set_name or "over_" in set_name:
-            category = "totals"
-        elif "ah_" in set_name:
-            category = "handicap"
-        elif set_name == "three_way":
-            category = "3-way"
-        elif set_name in ["one_vs_x2", "two_vs_1x", "x_vs_12"]:
-            category = "double-chance"
-        elif set_name == "both_score":
-            category = "btts"
-
-        if category:
-            for key in keys:
-                cat_map[key] = category
-    MARKET_CATEGORIES = cat_map
+    set_categories = {
+        set_name: EXACT_MARKET_CATEGORIES.get(set_name)
+        or next((cat for part, cat in PREFIX_MARKET_CATEGORIES if part in set_name), None)
+        for set_name in MARKET_SETS
+    }
+    MARKET_CATEGORIES = {
+        key: category
+        for set_name, keys in MARKET_SETS.items()
+        if (category := set_categories[set_name])
+        for key in keys
+    }
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -75,12 +131,60 @@ def slugify(text: str, rules: Dict[str, Any]) -> str:
     return text
 
 
-# pick_best_odds function remains unchanged
-def pick_best_odds(matches, key):
+def _safe_float(value_raw: Any) -> float:
+    """Converts a raw odd to float, returning NaN for missing or unparsable values."""
+    if isinstance(value_raw, (int, float)):
+        return float(value_raw)
+    if isinstance(value_raw, str) and value_raw.strip():
+        try:
+            return float(value_raw)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def _parse_odds(raw_values: List[Any]) -> np.ndarray:
+    """
+    Batch-parses raw odds into a float64 array, NaN where missing or unparsable.
+    Callers keep the usable ones with a `values > 0` mask instead of per-value try/except.
+    """
+    return np.fromiter(map(_safe_float, raw_values), dtype=np.float64, count=len(raw_values))
+
+
+def build_odds_array(matches: List[Dict], key: str) -> np.ndarray:
+    """
+    Materializes one market's odds across `matches` as a float64 array (NaN where missing).
+    Build it once per group and pass it to `pick_best_odds` for every lookup of that market.
+    Unparsable odds are logged here, as `pick_best_odds` does on its scalar path.
+    """
+    raw_values = [match.get(key) for match in matches]
+    values = _parse_odds(raw_values)
+    if np.isnan(values).any():
+        bad_matches = [
+            f"{match.get('home_team')} vs {match.get('away_team')} ({raw!r})"
+            for match, raw, value in zip(matches, raw_values, values.tolist())
+            if value != value and isinstance(raw, str) and raw.strip()
+        ]
+        if bad_matches:
+            logger.warning("Error parsing odd %s from match(es): %s", key, ", ".join(bad_matches))
+    return values
+
+
+def pick_best_odds(matches, key, odds_matrix: Optional[Dict[str, np.ndarray]] = None):
     """
     Pick the best odd across all matches for a specific market
     Returns the best odd value, its source, and the match ID
+    When `odds_matrix` holds a precomputed array for `key`, the argmax runs in NumPy.
     """
+    if odds_matrix is not None and key in odds_matrix:
+        odds = odds_matrix[key]
+        if np.isnan(odds).all():
+            return 0, None, None
+        idx = int(np.nanargmax(odds))
+        if odds[idx] <= 0:
+            return 0, None, None
+        return float(odds[idx]), matches[idx].get("source"), matches[idx]
+
     best_value = 0
     best_source = None
     best_match_id = None
@@ -98,21 +202,189 @@ def pick_best_odds(matches, key):
                 best_source = match.get("source")
                 best_match_id = match
         except (ValueError, TypeError) as e:
-            print(f"Error parsing odd {key} from match {match.get('home_team')} vs {match.get('away_team')}: {e}")
+            logger.warning(
+                "Error parsing odd %s from match %s vs %s: %s", key, match.get('home_team'), match.get('away_team'), e
+            )
             continue
     return best_value, best_source, best_match_id
 
 
-# check_arbitrage function remains unchanged
-def check_arbitrage(odds):
-    """Check if there's an arbitrage opportunity"""
-    if any(v <= 0 for v, _ in odds.values()):
-        return None
-    sources = {src for _, src in odds.values()}
-    if len(sources) < 2:
+def _best_odds_combination(
+        candidates: List[List[Tuple[float, str, Dict]]],
+        bound: float = 1.0
+) -> Optional[Tuple[int, ...]]:
+    """
+    Picks one (value, source, match) candidate per key so that the sum of inverse odds is
+    minimal and below `bound`, among combinations drawing from at least 2 sources.
+    Branch-and-bound DFS over the keys in order: a branch is dropped as soon as its partial
+    sum plus the best possible inverse odd of every remaining key can't beat the best found.
+    Leaves are visited in `itertools.product` order and sums accumulate like `check_arbitrage`,
+    so ties go to the first combination. Returns the candidate index per key, or None.
+    """
+    inverses = [[1 / float(v) for v, _, _ in key_candidates] for key_candidates in candidates]
+    source_bits = [[1 << sid(s) for _, s, _ in key_candidates] for key_candidates in candidates]
+    all_sources = 0
+    for key_bits in source_bits:
+        for bit in key_bits:
+            all_sources |= bit
+    if not all_sources & (all_sources - 1):
         return None
-    total = sum(1 / float(v) for v, _ in odds.values())
-    return total if total < 1 else None
+
+    # suffix_min[i]: smallest possible sum of inverse odds over keys i..end
+    suffix_min = [0.0] * (len(candidates) + 1)
+    for i in range(len(candidates) - 1, -1, -1):
+        suffix_min[i] = suffix_min[i + 1] + min(inverses[i])
+    # Tolerance so float rounding in the bound never prunes a branch that could tie or win
+    eps = 1e-12
+
+    best_sum = bound
+    best_idx: Optional[Tuple[int, ...]] = None
+    chosen = [0] * len(candidates)
+    last = len(candidates) - 1
+
+    def dfs(key_idx: int, partial: float, mask: int):
+        nonlocal best_sum, best_idx
+        for j, inv in enumerate(inverses[key_idx]):
+            total = partial + inv
+            if total + suffix_min[key_idx + 1] >= best_sum + eps:
+                continue
+            chosen[key_idx] = j
+            new_mask = mask | source_bits[key_idx][j]
+            if key_idx == last:
+                # At least 2 distinct sources <=> more than one bit set
+                if total < best_sum and new_mask & (new_mask - 1):
+                    best_sum = total
+                    best_idx = tuple(chosen)
+            else:
+                dfs(key_idx + 1, total, new_mask)
+
+    dfs(0, 0.0, 0)
+    return best_idx
+
+
+_UNSET = object()
+
+
+def check_arbitrage(odds):
+    """
+    Check if there's an arbitrage opportunity
+    Single pass over the odds, without building intermediate sets or lists.
+    """
+    total = 0.0
+    first_src = _UNSET
+    multi_source = False
+    for v, src in odds.values():
+        if v <= 0:
+            return None
+        total += 1.0 / v
+        if first_src is _UNSET:
+            first_src = src
+        elif src != first_src:
+            multi_source = True
+    return total if multi_source and total < 1.0 else None
+
+
+# One JSON object per line; non-string keys are stringified like the stdlib json module does
+_JSONL_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+
+class _LogWriter:
+    """
+    Appends JSON-Lines log entries from a background thread, so the analysis loop only
+    pays for a queue.put. Entries arriving within `flush_interval` seconds are written
+    together. The writer thread owns the filesystem state: directories it already created
+    and up to `max_open_files` append handles kept open between batches.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_open_files: int = 128):
+        self.flush_interval = flush_interval
+        self.max_open_files = max_open_files
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._known_dirs: Set[str] = set()
+        self._handles: "OrderedDict[str, BinaryIO]" = OrderedDict()
+
+    def enqueue(self, path: str, entry: Dict[str, Any]):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._drain, name="arb-log-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put((path, entry))
+
+    def _reset_after_fork(self):
+        # The writer thread does not survive a fork, a forked worker starts its own on first use
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._handles = OrderedDict()
+
+    def flush(self):
+        """Blocks until every queued entry has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Writes everything still queued, then closes the cached file handles."""
+        self.flush()
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            handle.close()
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _handle_for(self, path: str) -> BinaryIO:
+        handle = self._handles.get(path)
+        if handle is not None:
+            self._handles.move_to_end(path)
+            return handle
+        log_dir = os.path.dirname(path)
+        if log_dir not in self._known_dirs:
+            os.makedirs(log_dir, exist_ok=True)
+            self._known_dirs.add(log_dir)
+        if len(self._handles) >= self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        handle = open(path, "ab", buffering=1 << 16)
+        self._handles[path] = handle
+        return handle
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        entries_by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for path, entry in batch:
+            entries_by_path.setdefault(path, []).append(entry)
+        for path, entries in entries_by_path.items():
+            try:
+                handle = self._handle_for(path)
+                handle.write(b"".join(orjson.dumps(entry, option=_JSONL_OPTIONS) for entry in entries))
+                handle.flush()
+            except OSError as e:
+                # Drop the cached state, the file or directory may have been removed underneath us
+                self._known_dirs.discard(os.path.dirname(path))
+                stale = self._handles.pop(path, None)
+                if stale is not None:
+                    stale.close()
+                logger.error("Error writing appearance log %s: %s", path, e)
+
+
+_log_writer = _LogWriter()
+atexit.register(_log_writer.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_log_writer._reset_after_fork)
 
 
 def _write_arb_appearance_log(log_entry: Dict[str, Any]):
@@ -133,32 +405,36 @@ def _write_arb_appearance_log(log_entry: Dict[str, Any]):
         LOG_OUTPUT_ROOT, MODE_NAME, SPORT_NAME, today_str,
         misvalue_source, group_id, "appearance_investigations"
     )
-    os.makedirs(log_dir, exist_ok=True)
-    log_file_path = os.path.join(log_dir, f"{sanitized_market_name}.json")
+    # One JSON object per line, appended by the background writer
+    log_file_path = os.path.join(log_dir, f"{sanitized_market_name}.jsonl")
+    _log_writer.enqueue(log_file_path, log_entry)
 
-    try:
-        if os.path.exists(log_file_path):
-            with open(log_file_path, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        else:
-            logs = []
-    except (json.JSONDecodeError, IOError):
-        logs = []
 
-    logs.append(log_entry)
-    with open(log_file_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2, ensure_ascii=False)
+def build_previous_odds(previous_group: List[Dict]) -> Dict[Tuple[str, str], Any]:
+    """
+    Flattens a group's matches from the previous cycle to a (source, odd_name) -> value map.
+    A source with several matches is represented by its last one.
+    """
+    latest_by_source = {m['source']: m for m in previous_group}
+    return {
+        (source, k): v
+        for source, match in latest_by_source.items()
+        for k, v in match.items()
+        if k.endswith('_odd')
+    }
 
 
 def _identify_misvalue_by_appearance(
     opportunity: Dict,
     all_matches_in_group: List[Dict],
     previous_match_data: Dict[str, List[Dict]],
-    activity_data: Dict[str, Any]
+    activity_data: Dict[str, Any],
+    previous_odds: Optional[Dict[Tuple[str, str], Any]] = None
 ) -> Optional[str]:
     """
     Identifies the misvalue source by checking which source's odds changed
     from the previous cycle to create the arbitrage opportunity.
+    Pass `previous_odds` (from `build_previous_odds`) to reuse the group's flattened old odds.
     """
     if not all_matches_in_group:
         return None
@@ -167,8 +443,8 @@ def _identify_misvalue_by_appearance(
     if not group_id or group_id not in previous_match_data:
         return None # No previous data to compare against
 
-    previous_group = previous_match_data[group_id]
-    previous_matches_by_src = {m['source']: m for m in previous_group}
+    if previous_odds is None:
+        previous_odds = build_previous_odds(previous_match_data[group_id])
 
     involved_sources = opportunity.get("arbitrage_sources", "").split(", ")
     odds_data = opportunity.get("best_odds", {})
@@ -187,9 +463,7 @@ def _identify_misvalue_by_appearance(
         log_details["new_odds"][source] = new_odd
 
         # Find the old odd for this source and odd_name
-        old_odd = None
-        if source in previous_matches_by_src:
-            old_odd = previous_matches_by_src[source].get(odd_name)
+        old_odd = previous_odds.get((source, odd_name))
         log_details["old_odds"][source] = old_odd
 
         if old_odd is not None and new_odd is not None:
@@ -234,47 +508,85 @@ def _identify_misvalue_by_appearance(
     return misvalue_source
 
 
+class GroupOdds(NamedTuple):
+    """Every positive `_odd` of a match group, parsed once and laid out per odd key."""
+    source_count: int
+    # odd key -> (odds as float64, interned source id of each odd), in match order
+    odds: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    # odd keys offered by 3+ sources, as an insertion-ordered dict (values unused) in scan order
+    common_keys: Dict[str, None]
+
+
+def build_group_odds(all_matches_in_group: List[Dict]) -> GroupOdds:
+    """
+    Parses the odds of a whole match group once, so that `_identify_misvalue_source`
+    doesn't re-scan every match for each source combination and opportunity.
+    """
+    unique_sources_in_group = {m.get("source") for m in all_matches_in_group if m.get("source")}
+
+    # Raw values, their source ids and scan position per odd key, parsed in one batch per key below
+    raw_odds_map: Dict[str, Tuple[List[int], List[Any], List[int]]] = {}
+    position = 0
+    for match in all_matches_in_group:
+        source = match.get("source")
+        if not source: continue
+        source_id = sid(source)
+        for key, value in match.items():
+            if key.endswith("_odd"):
+                source_ids, raw_values, positions = raw_odds_map.setdefault(key, ([], [], []))
+                source_ids.append(source_id)
+                raw_values.append(value)
+                positions.append(position)
+                position += 1
+
+    parsed = []
+    for key, (source_ids, raw_values, positions) in raw_odds_map.items():
+        values = _parse_odds(raw_values)
+        valid = values > 0
+        if valid.any():
+            first_valid = positions[int(valid.argmax())]
+            parsed.append((first_valid, key, values[valid], np.array(source_ids, dtype=np.int32)[valid]))
+    # Keys are ordered by their first usable odd. common_keys keeps that order (a set would iterate in
+    # hash order, which changes between runs), so the scoring keys picked from it are deterministic.
+    parsed.sort(key=lambda entry: entry[0])
+    odds = {key: (values, sources) for _, key, values, sources in parsed}
+    common_keys = dict.fromkeys(k for k, (values, _) in odds.items() if values.size >= 3)
+    return GroupOdds(len(unique_sources_in_group), odds, common_keys)
+
+
 def _identify_misvalue_source(
     opportunity: Dict,
-    all_matches_in_group: List[Dict]
+    all_matches_in_group: List[Dict],
+    group_odds: Optional[GroupOdds] = None
 ) -> Optional[str]:
     """
     Identifies an outlier source using a weighted, multi-category scoring system.
     It checks common odds from 'totals', 'handicap', and '3-way' markets,
     giving extra weight to the odd that caused the arbitrage.
+    Pass `group_odds` (from `build_group_odds`) to reuse odds already parsed for the group.
     """
     # Constants
     ARB_ODD_WEIGHT = 1.5
     TARGET_CATEGORIES = ['totals', 'handicap', '3-way']
 
+    # 1. Map of all available odds from all sources, parsed once per group
+    if group_odds is None:
+        group_odds = build_group_odds(all_matches_in_group)
+
     # Pre-flight checks
-    unique_sources_in_group = {m.get("source") for m in all_matches_in_group if m.get("source")}
-    if len(unique_sources_in_group) < 3:
+    if group_odds.source_count < 3:
         return None
 
-    # 1. Build a map of all available odds from all sources
-    all_odds_map: Dict[str, List[Tuple[str, float]]] = {}
-    for match in all_matches_in_group:
-        source = match.get("source")
-        if not source: continue
-        for key, value in match.items():
-            if key.endswith("_odd"):
-                try:
-                    odd_val = float(value)
-                    if odd_val > 0:
-                        all_odds_map.setdefault(key, []).append((source, odd_val))
-                except (ValueError, TypeError):
-                    continue
-
     # 2. Find all odds that are "common" (offered by 3+ sources)
-    common_odds_keys = {k for k, v in all_odds_map.items() if len(v) >= 3}
+    common_odds_keys = group_odds.common_keys
     if not common_odds_keys:
         return None
 
     # 3. Select the best odds to use for comparison from different categories
     selected_keys_for_scoring = []
     used_categories = set()
-    arbitrage_odd_keys = set(opportunity['best_odds'].keys())
+    # The opportunity's own key order, not a set's hash order, decides which arb odd is scored
+    arbitrage_odd_keys = opportunity['best_odds'].keys()
 
     # Priority 1: Use the actual arbitrage odd if it's common
     for key in arbitrage_odd_keys:
@@ -297,32 +609,194 @@ def _identify_misvalue_source(
     if not selected_keys_for_scoring:
         return None
 
-    # 4. Calculate a weighted deviation score for each source
-    source_scores = defaultdict(float)
+    # 4. Calculate a weighted deviation score for each source, indexed by source id
+    n_sources = len(SOURCE_REGISTRY)
+    source_scores = np.zeros(n_sources)
+    # Scan position of each source's first score, to break ties in favour of the earliest one
+    no_score = np.iinfo(np.int64).max
+    first_scored = np.full(n_sources, no_score, dtype=np.int64)
+    scanned = 0
     for key in selected_keys_for_scoring:
-        # Get probability data (1/odd) for the current odd key
-        prob_data = [(source, 1 / odd) for source, odd in all_odds_map[key] if odd > 0]
+        # Get probability data (1/odd) for the current odd key; odds were filtered to > 0 above
+        odd_values, odd_sources = group_odds.odds[key]
+        probs = 1.0 / odd_values
 
         # Determine weight for this odd's score
         weight = ARB_ODD_WEIGHT if key in arbitrage_odd_keys else 1.0
 
-        # For each source, calculate its deviation from the consensus of others
-        for i in range(len(prob_data)):
-            source_to_check, prob_to_check = prob_data[i]
-            other_probs = [p[1] for j, p in enumerate(prob_data) if i != j]
-
-            if not other_probs:
-                continue
-
-            avg_other_probs = sum(other_probs) / len(other_probs)
-            deviation = abs(prob_to_check - avg_other_probs)
-            source_scores[source_to_check] += deviation * weight
+        # Each source's deviation from the mean of all the others (leave-one-out), in one pass
+        others_mean = (probs.sum() - probs) / (probs.size - 1)
+        deviations = np.abs(probs - others_mean) * weight
+        np.add.at(source_scores, odd_sources, deviations)
+        np.minimum.at(first_scored, odd_sources, np.arange(scanned, scanned + odd_sources.size))
+        scanned += odd_sources.size
 
     # 5. The source with the highest total score is the most likely outlier
-    if not source_scores:
+    scored = first_scored != no_score
+    if not scored.any():
         return None
 
-    return max(source_scores, key=source_scores.get)
+    top = np.flatnonzero(scored & (source_scores == source_scores[scored].max()))
+    return sname(int(top[np.argmin(first_scored[top])]))
+
+
+def build_url_builders():
+    """
+    Pre-computes one URL builder per source from `URL_TEMPLATES`, resolving the mode/sport
+    mappings and slug rules once instead of on every emitted opportunity.
+    NOTE: Call this function from `main.py` after `URL_TEMPLATES`, `SPORT_NAME` and `MODE_NAME` are set.
+    """
+    global _URL_BUILDERS
+    builders = {}
+    for source_key, config in URL_TEMPLATES.items():
+        template = config.get("template")
+        if not template:
+            continue
+        mappings = config.get("mappings", {})
+        mode_val = mappings.get("mode", {}).get(MODE_NAME, MODE_NAME)
+        sport_val = mappings.get("sport", {}).get(SPORT_NAME, SPORT_NAME)
+        slug_rules = config.get("slugify_fields", {}).get("tournament_name")
+        if slug_rules:
+            format_tournament = functools.lru_cache(maxsize=4096)(lambda name, rules=slug_rules: slugify(name, rules))
+        else:
+            format_tournament = lambda name: quote(name) if name else ""
+
+        def build(country_name, tournament_id, match_id, tournament_name,
+                  template=template, mode_val=mode_val, sport_val=sport_val, format_tournament=format_tournament):
+            return template.format(mode=mode_val, sport=sport_val, country_name=country_name,
+                                   tournament_id=tournament_id or "", match_id=match_id or "",
+                                   tournament_name=format_tournament(tournament_name))
+
+        builders[source_key] = build
+    _URL_BUILDERS = builders
+
+
+def _emit_match_details(opportunity: Dict[str, Any], source: str, original_match: Dict[str, Any]):
+    """Adds the per-source match fields (country, tournament, ids and match URL) to an opportunity."""
+    opportunity[f"{source}_country_name"] = original_match.get("country")
+    opportunity[f"tournament_{source}"] = original_match.get("tournament_name")
+
+    match_id_val = original_match.get("match_id")
+    tourn_id_val = original_match.get("tournament_id")
+
+    if match_id_val is not None:
+        try:
+            opportunity[f"{source}_match_id"] = int(match_id_val)
+        except (ValueError, TypeError):
+            opportunity[f"{source}_match_id"] = str(match_id_val)
+    if tourn_id_val is not None:
+        try:
+            opportunity[f"{source}_tournament_id"] = int(tourn_id_val)
+        except (ValueError, TypeError):
+            opportunity[f"{source}_tournament_id"] = str(tourn_id_val)
+
+    if 'match_url' in original_match:
+        opportunity[f"{source}_match_url"] = original_match['match_url']
+    elif match_id_val is not None:
+        if URL_TEMPLATES and not _URL_BUILDERS:
+            build_url_builders()
+        build_url = _URL_BUILDERS.get(source.lower())
+        if build_url:
+            try:
+                opportunity[f"{source}_match_url"] = build_url(
+                    original_match.get("country", ""), tourn_id_val, match_id_val, original_match.get("tournament_name")
+                )
+            except KeyError as e:
+                logger.warning("URL template for '%s' contains an unknown placeholder: %s", source, e)
+
+
+def _unique_id_match_ids(matches) -> Set[int]:
+    """
+    The match ids an opportunity's unique_id is made of, as ints: "007", " 7" and 7 are the same match.
+    Used both to build unique_ids and to find a group's activity entries, so the two always agree.
+    """
+    match_ids = set()
+    for match in matches:
+        match_id = match.get("match_id")
+        if not match_id: continue
+        try:
+            match_ids.add(int(match_id))
+        except (TypeError, ValueError):
+            continue
+    return match_ids
+
+
+def _build_opportunity(
+        name: str,
+        formatted_odds: Dict[str, Dict[str, Any]],
+        arb: float,
+        source_to_match_map: Dict[str, Dict]
+) -> Dict[str, Any]:
+    """Builds the opportunity record, including its sources string and match-id based unique_id."""
+    arbitrage_sources_str = ", ".join(sorted(source_to_match_map.keys()))
+
+    # Integer ids sort natively; the joined string is the key persisted in activity_tracker.json
+    match_ids = _unique_id_match_ids(source_to_match_map.values())
+    unique_id = "-".join(map(str, sorted(match_ids, reverse=True)))
+
+    return {
+        "complementary_set": name,
+        "best_odds": formatted_odds,
+        "arbitrage_percentage": round(arb, 4),
+        "arbitrage_sources": arbitrage_sources_str,
+        "unique_id": unique_id
+    }
+
+
+def _apply_misvalue_detection(
+        opportunity: Dict[str, Any],
+        all_matches_in_group: List[Dict],
+        previous_match_data: Dict[str, List[Dict]],
+        activity_data: Dict[str, Any],
+        group_odds: Optional[GroupOdds] = None,
+        previous_odds: Optional[Dict[Tuple[str, str], Any]] = None
+):
+    """
+    Sets `misvalue_source` on the opportunity, reusing the one remembered in activity_data
+    for its unique_id or detecting it with MISVALUE_DETECTION_METHOD, and remembers the result.
+    """
+    unique_id = opportunity.get("unique_id")
+    misvalue_source = None
+
+    if unique_id:
+        misvalue_source = activity_data.get(unique_id, {}).get('misvalue_source')
+
+    if not misvalue_source:
+        if MISVALUE_DETECTION_METHOD == "appearance":
+            misvalue_source = _identify_misvalue_by_appearance(
+                opportunity,
+                all_matches_in_group,
+                previous_match_data,
+                activity_data,
+                previous_odds
+            )
+        elif MISVALUE_DETECTION_METHOD == "comparaison":
+            misvalue_source = _identify_misvalue_source(opportunity, all_matches_in_group, group_odds)
+
+    if misvalue_source:
+        opportunity['misvalue_source'] = misvalue_source
+        if unique_id:
+            activity_data.setdefault(unique_id, {})['misvalue_source'] = misvalue_source
+
+
+def _populate_match_details(opportunity: Dict[str, Any], source_to_match_map: Dict[str, Dict]):
+    """Adds the match details of every source taking part in the opportunity."""
+    for source, original_match in source_to_match_map.items():
+        _emit_match_details(opportunity, source, original_match)
+
+
+def _present_keys(match: Dict) -> Set[str]:
+    """Keys of `match` holding a non-empty value."""
+    return {k for k, v in match.items() if v and str(v).strip()}
+
+
+def _sorted_odd_candidates(matches: List[Dict], key: str) -> List[Tuple[float, str, Dict]]:
+    """Returns the (value, source, match) entries with a positive odd for `key`, best odds first."""
+    values = _parse_odds([match.get(key) for match in matches])
+    valid = np.flatnonzero(values > 0)
+    # Sort by value descending to get best odds first; stable, so equal odds keep match order
+    order = valid[np.argsort(-values[valid], kind="stable")]
+    return [(float(values[i]), matches[i].get("source"), matches[i]) for i in order.tolist()]
 
 
 def _find_best_arb_for_combination(
@@ -330,17 +804,34 @@ def _find_best_arb_for_combination(
         sources_to_check: Tuple[str],
         all_matches_in_group: List[Dict],
         previous_match_data: Dict[str, List[Dict]],
-        activity_data: Dict[str, Any]
+        activity_data: Dict[str, Any],
+        group_odds: Optional[GroupOdds] = None,
+        group_candidates: Optional[Dict[str, List[Tuple[float, str, Dict]]]] = None,
+        present_keys: Optional[Set[str]] = None,
+        feasible_markets: Optional[List[Tuple[str, Tuple[str, ...]]]] = None,
+        previous_odds: Optional[Dict[Tuple[str, str], Any]] = None
 ) -> Optional[Dict]:
     """
     Finds the single best arbitrage opportunity for a specific combination of sources.
+    `group_candidates` memoizes, per odd key, the sorted candidates of the whole group so
+    that every source combination filters them instead of re-parsing the odds.
+    `present_keys` is the set of keys with a non-empty value on at least one of the matches.
+    `feasible_markets` restricts the scan to the (name, keys) market sets the whole group can fill.
     """
     best_opportunity = None
     best_arb_percentage = 1.0
+    # Per-market odds arrays over matches_in_combination, filled on first use
+    odds_matrix: Dict[str, np.ndarray] = {}
+
+    if present_keys is None:
+        present_keys = set().union(*map(_present_keys, matches_in_combination))
 
-    for name, keys in MARKET_SETS.items():
-        if any(all(not match.get(k) or str(match.get(k)).strip() == "" for match in matches_in_combination) for k in
-               keys):
+    if feasible_markets is None:
+        feasible_markets = MARKET_SETS.items()
+
+    for name, keys in feasible_markets:
+        # Skip markets where some key has no value on any match
+        if not present_keys.issuperset(keys):
             continue
 
         # Check if this market is in the full_check list
@@ -350,32 +841,19 @@ def _find_best_arb_for_combination(
 
             # For each key in the market, try all available sources
             for k in keys:
-                available_odds = []
-                for match in matches_in_combination:
-                    odd_value = match.get(k)
-                    if odd_value and str(odd_value).strip():
-                        try:
-                            value = float(odd_value)
-                            if value > 0:
-                                available_odds.append((value, match.get("source"), match))
-                        except (ValueError, TypeError):
-                            continue
-
-                if available_odds:
-                    # Sort by value descending to get best odds first
-                    available_odds.sort(key=lambda x: x[0], reverse=True)
-                    best_odds_with_details[k] = available_odds
-                else:
-                    best_odds_with_details[k] = []
-
-            # Try all combinations of odds for this market
+                if group_candidates is None:
+                    best_odds_with_details[k] = _sorted_odd_candidates(matches_in_combination, k)
+                    continue
+                if k not in group_candidates:
+                    group_candidates[k] = _sorted_odd_candidates(all_matches_in_group, k)
+                # Filtering keeps the descending order, the sort is stable
+                best_odds_with_details[k] = [c for c in group_candidates[k] if c[1] in sources_to_check]
+
+            # Score every combination of odds for this market at once and keep the best one
             if all(best_odds_with_details.get(k) for k in keys):
-                import itertools
-                for odds_combination in itertools.product(*[best_odds_with_details[k] for k in keys]):
-                    # Check if we have at least 2 different sources
-                    sources_in_combo = set(odd_data[1] for odd_data in odds_combination)
-                    if len(sources_in_combo) < 2:
-                        continue
+                best_combo = _best_odds_combination([best_odds_with_details[k] for k in keys], best_arb_percentage)
+                if best_combo is not None:
+                    odds_combination = tuple(best_odds_with_details[k][i] for k, i in zip(keys, best_combo))
 
                     # Create odds_for_check for this combination
                     odds_for_check = {}
@@ -391,98 +869,21 @@ def _find_best_arb_for_combination(
                     arb = check_arbitrage(odds_for_check)
                     if arb is not None and arb < best_arb_percentage:
                         # This is a better arbitrage opportunity
-                        arbitrage_match_ids = set()
-                        for source, match_obj in source_to_match_map.items():
-                            if match_obj.get("match_id"):
-                                arbitrage_match_ids.add(str(match_obj.get("match_id")))
-
-                        arbitrage_sources_set = set(source_to_match_map.keys())
-                        arbitrage_sources_str = ", ".join(sorted(list(arbitrage_sources_set)))
-
-                        sorted_match_ids = sorted(list(arbitrage_match_ids), key=int, reverse=True)
-                        unique_id = "-".join(sorted_match_ids)
-
-                        opportunity = {
-                            "complementary_set": name,
-                            "best_odds": formatted_odds,
-                            "arbitrage_percentage": round(arb, 4),
-                            "arbitrage_sources": arbitrage_sources_str,
-                            "unique_id": unique_id
-                        }
-
-                        # Apply misvalue detection logic
-                        unique_id = opportunity.get("unique_id")
-                        misvalue_source = None
-
-                        if unique_id and unique_id in activity_data and 'misvalue_source' in activity_data[unique_id]:
-                            misvalue_source = activity_data[unique_id]['misvalue_source']
-
-                        if not misvalue_source:
-                            if MISVALUE_DETECTION_METHOD == "appearance":
-                                misvalue_source = _identify_misvalue_by_appearance(
-                                    opportunity,
-                                    all_matches_in_group,
-                                    previous_match_data,
-                                    activity_data
-                                )
-                            elif MISVALUE_DETECTION_METHOD == "comparaison":
-                                misvalue_source = _identify_misvalue_source(opportunity, all_matches_in_group)
-
-                        if misvalue_source:
-                            opportunity['misvalue_source'] = misvalue_source
-                            if unique_id:
-                                activity_data.setdefault(unique_id, {})['misvalue_source'] = misvalue_source
-
-                        # Add match details
-                        for source, original_match in source_to_match_map.items():
-                            opportunity[f"{source}_country_name"] = original_match.get("country")
-                            opportunity[f"tournament_{source}"] = original_match.get("tournament_name")
-
-                            match_id_val = original_match.get("match_id")
-                            tourn_id_val = original_match.get("tournament_id")
-                            tourn_name_val = original_match.get("tournament_name")
-
-                            if match_id_val is not None:
-                                try:
-                                    opportunity[f"{source}_match_id"] = int(match_id_val)
-                                except (ValueError, TypeError):
-                                    opportunity[f"{source}_match_id"] = str(match_id_val)
-                            if tourn_id_val is not None:
-                                try:
-                                    opportunity[f"{source}_tournament_id"] = int(tourn_id_val)
-                                except (ValueError, TypeError):
-                                    opportunity[f"{source}_tournament_id"] = str(tourn_id_val)
-
-                            if 'match_url' in original_match:
-                                opportunity[f"{source}_match_url"] = original_match['match_url']
-                            else:
-                                source_key = source.lower()
-                                if source_key in URL_TEMPLATES and match_id_val is not None:
-                                    config = URL_TEMPLATES.get(source_key, {})
-                                    template = config.get("template")
-                                    if template:
-                                        mappings = config.get("mappings", {})
-                                        mode_val = mappings.get("mode", {}).get(MODE_NAME, MODE_NAME)
-                                        sport_val = mappings.get("sport", {}).get(SPORT_NAME, SPORT_NAME)
-                                        slug_rules = config.get("slugify_fields", {}).get("tournament_name")
-                                        formatted_tourn_name = slugify(tourn_name_val, slug_rules) if slug_rules else (
-                                            quote(tourn_name_val) if tourn_name_val else "")
-                                        format_params = {"mode": mode_val, "sport": sport_val,
-                                                         "country_name": original_match.get("country", ""),
-                                                         "tournament_id": tourn_id_val or "",
-                                                         "match_id": match_id_val or "",
-                                                         "tournament_name": formatted_tourn_name}
-                                        try:
-                                            opportunity[f"{source}_match_url"] = template.format(**format_params)
-                                        except KeyError as e:
-                                            print(
-                                                f"Warning: URL template for '{source}' contains an unknown placeholder: {e}")
+                        opportunity = _build_opportunity(name, formatted_odds, arb, source_to_match_map)
+                        _apply_misvalue_detection(
+                            opportunity, all_matches_in_group, previous_match_data, activity_data,
+                            group_odds, previous_odds
+                        )
+                        _populate_match_details(opportunity, source_to_match_map)
 
                         best_opportunity = opportunity
                         best_arb_percentage = arb
         else:
             # Original logic for non-full_check markets
-            best_odds_with_details = {k: pick_best_odds(matches_in_combination, k) for k in keys}
+            for k in keys:
+                if k not in odds_matrix:
+                    odds_matrix[k] = build_odds_array(matches_in_combination, k)
+            best_odds_with_details = {k: pick_best_odds(matches_in_combination, k, odds_matrix) for k in keys}
             odds_for_check = {k: (v, s) for k, (v, s, _) in best_odds_with_details.items()}
 
             arb = check_arbitrage(odds_for_check)
@@ -490,92 +891,16 @@ def _find_best_arb_for_combination(
                 formatted_odds = {k: {"value": v, "source": s} for k, (v, s, _) in best_odds_with_details.items()}
 
                 source_to_match_map = {}
-                arbitrage_match_ids = set()
                 for k, (v, s, match_obj) in best_odds_with_details.items():
                     if v > 0 and s and match_obj:
                         source_to_match_map[s] = match_obj
-                        if match_obj.get("match_id"):
-                            arbitrage_match_ids.add(str(match_obj.get("match_id")))
-
-                arbitrage_sources_set = set(source_to_match_map.keys())
-                arbitrage_sources_str = ", ".join(sorted(list(arbitrage_sources_set)))
-
-                sorted_match_ids = sorted(list(arbitrage_match_ids), key=int, reverse=True)
-                unique_id = "-".join(sorted_match_ids)
-
-                opportunity = {
-                    "complementary_set": name,
-                    "best_odds": formatted_odds,
-                    "arbitrage_percentage": round(arb, 4),
-                    "arbitrage_sources": arbitrage_sources_str,
-                    "unique_id": unique_id
-                }
-
-                # Apply misvalue detection logic (same as above)
-                unique_id = opportunity.get("unique_id")
-                misvalue_source = None
-
-                if unique_id and unique_id in activity_data and 'misvalue_source' in activity_data[unique_id]:
-                    misvalue_source = activity_data[unique_id]['misvalue_source']
-
-                if not misvalue_source:
-                    if MISVALUE_DETECTION_METHOD == "appearance":
-                        misvalue_source = _identify_misvalue_by_appearance(
-                            opportunity,
-                            all_matches_in_group,
-                            previous_match_data,
-                            activity_data
-                        )
-                    elif MISVALUE_DETECTION_METHOD == "comparaison":
-                        misvalue_source = _identify_misvalue_source(opportunity, all_matches_in_group)
-
-                if misvalue_source:
-                    opportunity['misvalue_source'] = misvalue_source
-                    if unique_id:
-                        activity_data.setdefault(unique_id, {})['misvalue_source'] = misvalue_source
-
-                # Add match details (same as above)
-                for source, original_match in source_to_match_map.items():
-                    opportunity[f"{source}_country_name"] = original_match.get("country")
-                    opportunity[f"tournament_{source}"] = original_match.get("tournament_name")
-
-                    match_id_val = original_match.get("match_id")
-                    tourn_id_val = original_match.get("tournament_id")
-                    tourn_name_val = original_match.get("tournament_name")
-
-                    if match_id_val is not None:
-                        try:
-                            opportunity[f"{source}_match_id"] = int(match_id_val)
-                        except (ValueError, TypeError):
-                            opportunity[f"{source}_match_id"] = str(match_id_val)
-                    if tourn_id_val is not None:
-                        try:
-                            opportunity[f"{source}_tournament_id"] = int(tourn_id_val)
-                        except (ValueError, TypeError):
-                            opportunity[f"{source}_tournament_id"] = str(tourn_id_val)
-
-                    if 'match_url' in original_match:
-                        opportunity[f"{source}_match_url"] = original_match['match_url']
-                    else:
-                        source_key = source.lower()
-                        if source_key in URL_TEMPLATES and match_id_val is not None:
-                            config = URL_TEMPLATES.get(source_key, {})
-                            template = config.get("template")
-                            if template:
-                                mappings = config.get("mappings", {})
-                                mode_val = mappings.get("mode", {}).get(MODE_NAME, MODE_NAME)
-                                sport_val = mappings.get("sport", {}).get(SPORT_NAME, SPORT_NAME)
-                                slug_rules = config.get("slugify_fields", {}).get("tournament_name")
-                                formatted_tourn_name = slugify(tourn_name_val, slug_rules) if slug_rules else (
-                                    quote(tourn_name_val) if tourn_name_val else "")
-                                format_params = {"mode": mode_val, "sport": sport_val,
-                                                 "country_name": original_match.get("country", ""),
-                                                 "tournament_id": tourn_id_val or "", "match_id": match_id_val or "",
-                                                 "tournament_name": formatted_tourn_name}
-                                try:
-                                    opportunity[f"{source}_match_url"] = template.format(**format_params)
-                                except KeyError as e:
-                                    print(f"Warning: URL template for '{source}' contains an unknown placeholder: {e}")
+
+                opportunity = _build_opportunity(name, formatted_odds, arb, source_to_match_map)
+                _apply_misvalue_detection(
+                    opportunity, all_matches_in_group, previous_match_data, activity_data,
+                    group_odds, previous_odds
+                )
+                _populate_match_details(opportunity, source_to_match_map)
 
                 best_opportunity = opportunity
                 best_arb_percentage = arb
@@ -597,7 +922,7 @@ def analyze_optimal_arbitrage(
 
     group_id = matching_group[0].get("matching_group_id")
     if not group_id:
-        print("Warning: Matching group is missing 'matching_group_id'. Skipping.")
+        logger.warning("Matching group is missing 'matching_group_id'. Skipping.")
         return None
 
     first_match = matching_group[0]
@@ -610,7 +935,26 @@ def analyze_optimal_arbitrage(
     valid_country_names = [c for c in [m.get("country") for m in matching_group] if
                            isinstance(c, str) and c.strip() and c.lower() not in invalid_names]
     country = min(valid_country_names, key=len) if valid_country_names else (first_match.get("country") or "unknown")
-    unique_sources = sorted(list({m.get("source") for m in matching_group if m.get("source")}))
+    unique_sources = sorted({m.get("source") for m in matching_group if m.get("source")})
+
+    present_keys_by_source: Dict[str, Set[str]] = defaultdict(set)
+    for m in matching_group:
+        if m.get("source"):
+            present_keys_by_source[m["source"]] |= _present_keys(m)
+    # Markets the group as a whole cannot fill are skipped for every source combination
+    group_keys = set().union(*present_keys_by_source.values())
+    feasible_markets = [(name, keys) for name, keys in MARKET_SETS.items() if group_keys.issuperset(keys)]
+    if not feasible_markets:
+        return None
+
+    # Odds parsed once for the whole group, shared by every source combination's misvalue scoring
+    group_odds = build_group_odds(matching_group) if MISVALUE_DETECTION_METHOD == "comparaison" else None
+    # Old odds flattened once for the whole group, for the appearance method
+    previous_odds = None
+    if MISVALUE_DETECTION_METHOD == "appearance" and group_id in previous_match_data:
+        previous_odds = build_previous_odds(previous_match_data[group_id])
+    # Full-check candidates per odd key, filled by the first combination that needs them
+    group_candidates: Dict[str, List[Tuple[float, str, Dict]]] = {}
 
     all_opportunities = []
     for r in range(2, len(unique_sources) + 1):
@@ -618,7 +962,10 @@ def analyze_optimal_arbitrage(
             matches_for_combo = [m for m in matching_group if m.get("source") in source_combo]
             # Pass the entire matching_group for misvalue analysis
             opportunity = _find_best_arb_for_combination(
-                matches_for_combo, source_combo, matching_group, previous_match_data, activity_data
+                matches_for_combo, source_combo, matching_group, previous_match_data, activity_data,
+                group_odds, group_candidates,
+                set().union(*(present_keys_by_source[s] for s in source_combo)),
+                feasible_markets, previous_odds
             )
             if opportunity:
                 all_opportunities.append(opportunity)
@@ -641,5 +988,58 @@ def analyze_optimal_arbitrage(
         "opportunities": all_opportunities
     }
 
-    print(f"Arbitrage Group Found: {best_home} vs {best_away} ({group_id}) with {len(all_opportunities)} combinations.")
-    return final_object
\ No newline at end of file
+    logger.info(
+        "Arbitrage Group Found: %s vs %s (%s) with %d combinations.", best_home, best_away, group_id, len(all_opportunities)
+    )
+    return final_object
+
+
+def _analyze_group_in_worker(
+    matching_group: List[Dict],
+    previous_match_data: Dict[str, List[Dict]],
+    activity_data: Dict[str, Any]
+) -> Tuple[Optional[Dict], Dict[str, Any]]:
+    """Process-pool entry point: analyses one group and hands back its activity entries."""
+    group_object = analyze_optimal_arbitrage(matching_group, previous_match_data, activity_data)
+    # Worker processes exit without running atexit handlers
+    _log_writer.flush()
+    return group_object, activity_data
+
+
+def analyze_groups_in_pool(
+    executor: Executor,
+    matching_groups: List[List[Dict]],
+    previous_match_data: Dict[str, List[Dict]],
+    activity_data: Dict[str, Any]
+) -> List[Optional[Dict]]:
+    """
+    Runs analyze_optimal_arbitrage for every group on a process pool.
+    Each worker only receives the previous-cycle data and the activity entries of its own
+    group; the entries it hands back are merged into `activity_data`.
+    Results are returned in the order of `matching_groups`.
+    """
+    # unique_ids are the "-"-joined match ids of the opportunity's matches
+    uids_by_match_id: Dict[str, List[str]] = defaultdict(list)
+    for unique_id in activity_data:
+        for match_id in unique_id.split("-"):
+            uids_by_match_id[match_id].append(unique_id)
+
+    futures = []
+    for group in matching_groups:
+        group_id = group[0].get("matching_group_id") if group else None
+        group_previous = {group_id: previous_match_data[group_id]} if group_id in previous_match_data else {}
+        match_ids = set(map(str, _unique_id_match_ids(group)))
+        group_activity = {
+            unique_id: activity_data[unique_id]
+            for match_id in match_ids
+            for unique_id in uids_by_match_id.get(match_id, ())
+            if match_ids.issuperset(unique_id.split("-"))
+        }
+        futures.append(executor.submit(_analyze_group_in_worker, group, group_previous, group_activity))
+
+    results = []
+    for future in futures:
+        group_object, group_activity = future.result()
+        activity_data.update(group_activity)
+        results.append(group_object)
+    return results
\ No newline at end of file
@@ -1,10 +1,14 @@
 # ev_calculator.py
 
 import os
-import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from file_utils import load_json_from_file, save_json_to_file
+import sys
+import itertools
+import orjson
+from typing import Callable, Dict, Iterable, Iterator, List, Any, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+
+import numpy as np
+from file_utils import load_json_from_file, load_journaled_json, save_journaled_json
 
 # --- Global placeholders (populated by main.py) ---
 METHOD: str = "ONE_SHARPING"
@@ -13,7 +17,7 @@ SHARPING_GROUP: List[str] = []
 EV_SOURCE: str = ""
 ODDS_INTERVAL: List[float] = [1.0, 10.0]
 MIN_OVERPRICE: float = 0.0
-MARKET_SETS: Dict[str, List[str]] = {}
+MARKET_SETS: Dict[str, Tuple[str, ...]] = {}
 URL_TEMPLATES: Dict[str, str] = {}
 SPORT_NAME: str = ""
 MODE_NAME: str = ""
@@ -27,14 +31,34 @@ ONLY_SHOW_EV_SOURCE_OPPS: bool = False
 # ----------------------------------------------------
 
 
+_URL_TEMPLATES_LOWER: Dict[str, Any] = {}
+_REQUIRED_KEYS_CACHE: Dict[str, Tuple[str, ...]] = {}
+
+
+def build_url_cache() -> Dict[str, Any]:
+    """Indexes URL_TEMPLATES by lower-cased source name. `main.py` calls this once the templates are loaded."""
+    global _URL_TEMPLATES_LOWER
+    _URL_TEMPLATES_LOWER = {k.lower(): v for k, v in URL_TEMPLATES.items()}
+    _REQUIRED_KEYS_CACHE.clear()
+    return _URL_TEMPLATES_LOWER
+
+
+def _required_keys(template: str) -> Tuple[str, ...]:
+    """Placeholder names of a URL template, parsed once per template."""
+    keys = _REQUIRED_KEYS_CACHE.get(template)
+    if keys is None:
+        keys = _REQUIRED_KEYS_CACHE[template] = tuple(k.split('}')[0] for k in template.split('{')[1:])
+    return keys
+
+
 def build_source_url(source_name: str, match_data: Dict[str, Any]) -> str:
     """
     Builds a specific match URL for a given source using URL_TEMPLATES.
     This version handles case-insensitivity and the new config structure
     with 'template' and 'mappings' keys.
     """
-    # Create a case-insensitive lookup dictionary on the fly.
-    url_templates_lower = {k.lower(): v for k, v in URL_TEMPLATES.items()}
+    # Case-insensitive lookup, built once from URL_TEMPLATES
+    url_templates_lower = _URL_TEMPLATES_LOWER or build_url_cache()
     template_config = url_templates_lower.get(source_name.lower())
 
     if match_data.get("match_url"):
@@ -67,8 +91,7 @@ def build_source_url(source_name: str, match_data: Dict[str, Any]) -> str:
         if 'sport' in mappings and SPORT_NAME in mappings.get('sport', {}):
             format_data['sport'] = mappings['sport'][SPORT_NAME]
 
-        required_keys = [k.split('}')[0] for k in template.split('{')[1:]]
-        missing_keys = [key for key in required_keys if key not in format_data or not format_data[key]]
+        missing_keys = [key for key in _required_keys(template) if key not in format_data or not format_data[key]]
         if missing_keys:
             return ""
 
@@ -80,7 +103,7 @@ def build_source_url(source_name: str, match_data: Dict[str, Any]) -> str:
         return ""
 
 
-def get_fair_odds_one_sharp(market_set: List[str], sharp_match: Dict[str, Any]) -> Optional[Dict[str, float]]:
+def get_fair_odds_one_sharp(market_set: Sequence[str], sharp_match: Dict[str, Any]) -> Optional[Dict[str, float]]:
     """Calculates fair odds by removing the vig from a single sharp source."""
     odds_values = [sharp_match.get(odd_name) for odd_name in market_set]
     if not all(isinstance(o, (int, float)) and o > 0 for o in odds_values):
@@ -97,39 +120,132 @@ def get_fair_odds_one_sharp(market_set: List[str], sharp_match: Dict[str, Any])
     return fair_odds
 
 
-def get_fair_odds_multiple_sharp(market_set: List[str], matches_by_src: Dict[str, Dict[str, Any]]) -> Optional[
+def get_fair_odds_multiple_sharp(market_set: Sequence[str], matches_by_src: Dict[str, Dict[str, Any]]) -> Optional[
     Dict[str, float]]:
     """Calculates fair odds based on the average odds from a group of sharp sources."""
-    avg_odds_calculator = {odd_name: {'sum': 0.0, 'count': 0} for odd_name in market_set}
-
-    for src in SHARPING_GROUP:
-        if src in matches_by_src:
-            match = matches_by_src[src]
-            for odd_name in market_set:
-                odd_value = match.get(odd_name)
-                if isinstance(odd_value, (int, float)) and odd_value > 0:
-                    avg_odds_calculator[odd_name]['sum'] += odd_value
-                    avg_odds_calculator[odd_name]['count'] += 1
-
-    avg_odds = {}
-    for odd_name, data in avg_odds_calculator.items():
-        if data['count'] > 0:
-            avg_odds[odd_name] = data['sum'] / data['count']
-        else:
-            return None
-
-    odds_values = list(avg_odds.values())
-    vig_sum = sum(1.0 / o for o in odds_values)
+    # One row per sharp source present, NaN where its odd is missing or invalid
+    odds = np.array([
+        [o if isinstance(o, (int, float)) and o > 0 else np.nan for o in map(matches_by_src[src].get, market_set)]
+        for src in SHARPING_GROUP if src in matches_by_src
+    ], dtype=np.float64).reshape(-1, len(market_set))
+
+    counts = np.count_nonzero(~np.isnan(odds), axis=0)
+    if not counts.all():
+        return None
+    avg_odds = np.nansum(odds, axis=0) / counts
+
+    vig_sum = float((1.0 / avg_odds).sum())
     if vig_sum <= 0:
         return None
 
     fair_odds = {
         name: round(val * vig_sum, 4)
-        for name, val in avg_odds.items()
+        for name, val in zip(market_set, avg_odds.tolist())
     }
     return fair_odds
 
 
+class MarketLayout(NamedTuple):
+    """
+    MARKET_SETS laid end to end: every (market, odd) pair is one position of a flat vector,
+    and every distinct odd name is one column of a match's odds row.
+    """
+    odd_names: List[str]
+    odd_name_set: frozenset
+    market_sets: List[List[str]]
+    flat_odd_names: List[str]
+    flat_cols: np.ndarray
+    segment_starts: np.ndarray
+    segment_of: np.ndarray
+
+
+_MARKET_LAYOUT: Optional[MarketLayout] = None
+ODD_TO_MARKET: Dict[str, Tuple[str, ...]] = {}
+
+
+def intern_config():
+    """
+    Interns the configured source and odd names. `main.py` calls this once the settings are loaded,
+    so the per-match dict lookups on these keys can match by identity instead of comparing strings.
+    """
+    global SHARP_SOURCE, SHARPING_GROUP, EV_SOURCE, MARKET_SETS
+    SHARP_SOURCE = sys.intern(SHARP_SOURCE)
+    SHARPING_GROUP = [sys.intern(source) for source in SHARPING_GROUP]
+    EV_SOURCE = sys.intern(EV_SOURCE)
+    MARKET_SETS = {
+        sys.intern(market_name): tuple(sys.intern(odd_name) for odd_name in market_set)
+        for market_name, market_set in MARKET_SETS.items()
+    }
+
+
+def build_odd_to_market() -> Dict[str, Tuple[str, ...]]:
+    """Maps every odd name to the first market set containing it. `main.py` calls this once the market sets are loaded."""
+    global ODD_TO_MARKET
+    odd_to_market: Dict[str, Tuple[str, ...]] = {}
+    for market_set in MARKET_SETS.values():
+        for odd_name in market_set:
+            odd_to_market.setdefault(odd_name, market_set)
+    ODD_TO_MARKET = odd_to_market
+    return ODD_TO_MARKET
+
+
+def market_set_of(odd_name: str) -> Optional[Tuple[str, ...]]:
+    """The market set an odd name belongs to, or None for an unknown odd."""
+    return (ODD_TO_MARKET or build_odd_to_market()).get(odd_name)
+
+
+def build_market_layout() -> MarketLayout:
+    """Builds the flat layout of MARKET_SETS. `main.py` calls this once the market sets are loaded."""
+    global _MARKET_LAYOUT
+    # Empty market sets can never yield fair odds
+    market_sets = [list(market_set) for market_set in MARKET_SETS.values() if market_set]
+    flat_odd_names = [odd_name for market_set in market_sets for odd_name in market_set]
+    odd_index: Dict[str, int] = {}
+    for odd_name in flat_odd_names:
+        odd_index.setdefault(odd_name, len(odd_index))
+    lengths = [len(market_set) for market_set in market_sets]
+
+    _MARKET_LAYOUT = MarketLayout(
+        odd_names=list(odd_index),
+        odd_name_set=frozenset(odd_index),
+        market_sets=market_sets,
+        flat_odd_names=flat_odd_names,
+        flat_cols=np.array([odd_index[odd_name] for odd_name in flat_odd_names], dtype=np.intp),
+        segment_starts=np.cumsum([0] + lengths[:-1]).astype(np.intp),
+        segment_of=np.repeat(np.arange(len(lengths)), lengths),
+    )
+    return _MARKET_LAYOUT
+
+
+def build_odds_row(match: Dict[str, Any], layout: MarketLayout) -> np.ndarray:
+    """The match's odds in layout column order, NaN where an odd is missing or not a positive number."""
+    return np.fromiter(
+        (float(o) if isinstance(o, (int, float)) and o > 0 else np.nan for o in map(match.get, layout.odd_names)),
+        dtype=np.float64, count=len(layout.odd_names)
+    )
+
+
+def average_odds_row(matches_by_src: Dict[str, Dict[str, Any]], layout: MarketLayout) -> np.ndarray:
+    """Mean odds row of the SHARPING_GROUP sources, NaN where none of them has a valid odd."""
+    rows = [build_odds_row(matches_by_src[src], layout) for src in SHARPING_GROUP if src in matches_by_src]
+    if not rows:
+        return np.full(len(layout.odd_names), np.nan)
+    odds = np.vstack(rows)
+    counts = np.count_nonzero(~np.isnan(odds), axis=0)
+    with np.errstate(invalid="ignore"):
+        return np.nansum(odds, axis=0) / counts
+
+
+def fair_odds_flat(odds_row: np.ndarray, layout: MarketLayout) -> np.ndarray:
+    """
+    Vig-free odds of every layout position, computed for all markets at once.
+    Markets with a missing odd come out as NaN, like get_fair_odds_one_sharp returning None.
+    """
+    values = odds_row[layout.flat_cols]
+    vig_sums = np.add.reduceat(1.0 / values, layout.segment_starts)
+    return values * vig_sums[layout.segment_of]
+
+
 def get_involved_sources_for_ev(group: List[Dict[str, Any]]) -> List[str]:
     """
     Returns the list of involved sources for an EV opportunity.
@@ -165,7 +281,7 @@ def determine_overprice_source_for_ev(
     if not previous_match_group:
         return None
 
-    market_set = next((ms for ms in MARKET_SETS.values() if odd_name in ms), None)
+    market_set = market_set_of(odd_name)
     if not market_set:
         return None
 
@@ -246,68 +362,85 @@ def analyze_ev_opportunities(group: List[Dict[str, Any]], previous_match_data: D
     ev_source_match = matches_by_src[EV_SOURCE]
     group_id = ev_source_match.get("matching_group_id")
 
-    for market_name, market_odds_list in MARKET_SETS.items():
-        fair_odds = None
+    layout = _MARKET_LAYOUT or build_market_layout()
+    # An EV source match without any odd of the configured markets can't be overpriced:
+    # skip building the sharp odds rows for it
+    if layout.odd_name_set.isdisjoint(ev_source_match):
+        return None
+    ev_flat = build_odds_row(ev_source_match, layout)[layout.flat_cols]
+    if np.isnan(ev_flat).all():
+        return None
 
-        if METHOD == "ONE_SHARPING":
-            if SHARP_SOURCE not in matches_by_src: continue
-            sharp_match = matches_by_src[SHARP_SOURCE]
-            fair_odds = get_fair_odds_one_sharp(market_odds_list, sharp_match)
-        elif METHOD == "MULTIPLE_SHARPING":
-            fair_odds = get_fair_odds_multiple_sharp(market_odds_list, matches_by_src)
+    fair_flat = None
+    if METHOD == "ONE_SHARPING":
+        fair_flat = fair_odds_flat(build_odds_row(matches_by_src[SHARP_SOURCE], layout), layout)
+    elif METHOD == "MULTIPLE_SHARPING":
+        fair_flat = fair_odds_flat(average_odds_row(matches_by_src, layout), layout)
 
-        if not fair_odds:
-            continue
+    if fair_flat is None or not len(fair_flat):
+        return None
 
-        for odd_name, fair_value in fair_odds.items():
-            if not (ODDS_INTERVAL[0] <= fair_value <= ODDS_INTERVAL[1]):
-                continue
+    # Loose pre-filter on the unrounded fair odds (rounding to 4 decimals moves them by at most 5e-5),
+    # covering the odds interval, the EV odd beating the fair odd and the minimum overprice.
+    # The exact checks below still run on the rounded values, position by position in market order,
+    # so Python only handles the few positions that can qualify.
+    candidates = np.flatnonzero(
+        (fair_flat >= ODDS_INTERVAL[0] - 1e-4) & (fair_flat <= ODDS_INTERVAL[1] + 1e-4)
+        & (ev_flat > fair_flat - 1e-4) & (ev_flat >= (1.0 + MIN_OVERPRICE) * (fair_flat - 1e-4))
+    )
 
-            ev_source_odd = ev_source_match.get(odd_name)
-            if not isinstance(ev_source_odd, (int, float)) or ev_source_odd <= 0:
-                continue
+    for position in candidates.tolist():
+        odd_name = layout.flat_odd_names[position]
+        fair_value = round(float(fair_flat[position]), 4)
+        if not (ODDS_INTERVAL[0] <= fair_value <= ODDS_INTERVAL[1]):
+            continue
 
-            if ev_source_odd > fair_value:
-                overprice = (ev_source_odd / fair_value) - 1.0
-
-                if overprice >= MIN_OVERPRICE:
-                    unique_id = f"{ev_source_match.get('match_id')}-{odd_name}"
-
-                    ev_opp = {
-                        "source": EV_SOURCE,
-                        "odd_name": odd_name,
-                        "overpriced_odd_value": ev_source_odd,
-                        "fair_odd_value": round(fair_value, 4),
-                        "overprice": round(overprice, 4),
-                        "unique_id": unique_id,
-                        f"{EV_SOURCE}_country_name": ev_source_match.get("country_name", ""),
-                        f"tournament_{EV_SOURCE}": ev_source_match.get("tournament_name", ""),
-                        f"{EV_SOURCE}_match_id": ev_source_match.get("match_id", ""),
-                        f"{EV_SOURCE}_tournament_id": ev_source_match.get("tournament_id", ""),
-                        f"{EV_SOURCE}_match_url": build_source_url(EV_SOURCE, ev_source_match),
-                        "ev_sources": get_involved_sources_for_ev(group),
-                    }
-
-                    # Determine and retrieve overprice source if appearance investigation is enabled
-                    if APPEARANCE_INVESTIGATION:
-                        # 1. For new opportunities, try to determine the source by comparing with the previous cycle.
-                        if previous_match_data and group_id in previous_match_data:
-                            overprice_source = determine_overprice_source_for_ev(
-                                group, previous_match_data[group_id], odd_name
-                            )
-                            if overprice_source:
-                                ev_opp["overprice_source"] = overprice_source
-                                # Store it in the activity tracker for future cycles
-                                if activity_data is not None:
-                                    activity_data.setdefault(unique_id, {})["overprice_source"] = overprice_source
-
-                        # 2. For existing opportunities (where source wasn't determined above),
-                        # retrieve the already-known source from the activity tracker.
-                        if "overprice_source" not in ev_opp and activity_data and unique_id in activity_data:
-                            if activity_data[unique_id].get("overprice_source"):
-                                ev_opp["overprice_source"] = activity_data[unique_id]["overprice_source"]
-
-                    found_opportunities.append(ev_opp)
+        ev_source_odd = ev_source_match.get(odd_name)
+        if not isinstance(ev_source_odd, (int, float)) or ev_source_odd <= 0:
+            continue
+
+        if ev_source_odd > fair_value:
+            overprice = (ev_source_odd / fair_value) - 1.0
+
+            if overprice >= MIN_OVERPRICE:
+                unique_id = f"{ev_source_match.get('match_id')}-{odd_name}"
+
+                ev_opp = {
+                    "source": EV_SOURCE,
+                    "odd_name": odd_name,
+                    "overpriced_odd_value": ev_source_odd,
+                    "fair_odd_value": round(fair_value, 4),
+                    "overprice": round(overprice, 4),
+                    "unique_id": unique_id,
+                    f"{EV_SOURCE}_country_name": ev_source_match.get("country_name", ""),
+                    f"tournament_{EV_SOURCE}": ev_source_match.get("tournament_name", ""),
+                    f"{EV_SOURCE}_match_id": ev_source_match.get("match_id", ""),
+                    f"{EV_SOURCE}_tournament_id": ev_source_match.get("tournament_id", ""),
+                    f"{EV_SOURCE}_match_url": build_source_url(EV_SOURCE, ev_source_match),
+                    "ev_sources": get_involved_sources_for_ev(group),
+                }
+
+                # Determine and retrieve overprice source if appearance investigation is enabled
+                if APPEARANCE_INVESTIGATION:
+                    # 1. For new opportunities, try to determine the source by comparing with the previous cycle.
+                    if previous_match_data and group_id in previous_match_data:
+                        overprice_source = determine_overprice_source_for_ev(
+                            group, previous_match_data[group_id], odd_name
+                        )
+                        if overprice_source:
+                            ev_opp["overprice_source"] = overprice_source
+                            # Store it in the activity tracker for future cycles
+                            if activity_data is not None:
+                                activity_data.setdefault(unique_id, {})["overprice_source"] = overprice_source
+
+                    # 2. For existing opportunities (where source wasn't determined above),
+                    # retrieve the already-known source from the activity tracker.
+                    if "overprice_source" not in ev_opp and activity_data:
+                        known_source = activity_data.get(unique_id, {}).get("overprice_source")
+                        if known_source:
+                            ev_opp["overprice_source"] = known_source
+
+                found_opportunities.append(ev_opp)
 
     if found_opportunities:
         base_match = ev_source_match
@@ -322,38 +455,83 @@ def analyze_ev_opportunities(group: List[Dict[str, Any]], previous_match_data: D
             "date": base_match.get("date"),
             "time": base_match.get("time"),
             "country": country_canonical,
-            "all_sources": sorted(list(matches_by_src.keys())),
+            "all_sources": sorted(matches_by_src),
             "opportunities": found_opportunities
         }
         return ev_group_object
 
     return None
 
-def _write_ev_log(log_entry: Dict[str, Any], log_output_root: str, investigation_type: str):
-    """Saves a single log entry to the correct file, using the new directory structure."""
-    overprice_source_folder = log_entry["overprice_source"]
-    today_str = datetime.now().strftime("%d-%m-%Y")
+def _ev_log_path(log_output_root: str, date_str: str, log_entry: Dict[str, Any], investigation_type: str) -> str:
+    """Path of the JSON Lines file an investigation log entry belongs to."""
     odd_name_sanitized = log_entry['odd_name'].replace('/', '_')
-    group_id = log_entry['group_id']
-
     log_dir = os.path.join(
-        log_output_root, MODE_NAME, EV_SOURCE, SPORT_NAME, today_str,
-        overprice_source_folder, group_id, investigation_type
+        log_output_root, MODE_NAME, EV_SOURCE, SPORT_NAME, date_str,
+        log_entry["overprice_source"], log_entry['group_id'], investigation_type
     )
-    os.makedirs(log_dir, exist_ok=True)
-    log_file_path = os.path.join(log_dir, f"{odd_name_sanitized}.json")
+    return os.path.join(log_dir, f"{odd_name_sanitized}.jsonl")
+
+
+def _dump_jsonl(entries: Iterable[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries)
 
+
+def read_ev_logs(log_file_path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the entries of a JSON Lines investigation log, oldest first."""
+    with open(log_file_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
+
+
+def _migrate_legacy_ev_log(log_file_path: str):
+    """Moves the entries of a log written as one JSON array (`<odd>.json`) into its `.jsonl` file."""
+    legacy_path = log_file_path[:-1]
+    if not os.path.exists(legacy_path):
+        return
     try:
-        if os.path.exists(log_file_path):
-            with open(log_file_path, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        else:
-            logs = []
-    except (json.JSONDecodeError, IOError):
-        logs = []
-    logs.append(log_entry)
-    with open(log_file_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2, ensure_ascii=False)
+        with open(legacy_path, "rb") as f:
+            logs = orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError):
+        return
+    if isinstance(logs, list):
+        with open(log_file_path, "ab") as f:
+            f.write(_dump_jsonl(logs))
+    os.remove(legacy_path)
+
+
+def _append_ev_logs(log_file_path: str, log_entries: Sequence[Dict[str, Any]]):
+    """Appends log entries to a JSON Lines log file in a single write."""
+    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+    _migrate_legacy_ev_log(log_file_path)
+
+    # One JSON object per line: appending never re-reads or rewrites earlier entries
+    with open(log_file_path, "ab") as f:
+        f.write(_dump_jsonl(log_entries))
+
+
+def _write_ev_log(log_entry: Dict[str, Any], log_output_root: str, investigation_type: str):
+    """Appends a single log entry to the correct file, using the new directory structure."""
+    today_str = datetime.now().strftime("%d-%m-%Y")
+    _append_ev_logs(_ev_log_path(log_output_root, today_str, log_entry, investigation_type), (log_entry,))
+
+
+# Disappearance logs resolved during a lifecycle pass, grouped by log file until the pass flushes them
+_QUEUED_EV_LOGS: Dict[str, List[Dict[str, Any]]] = {}
+
+
+def _queue_ev_log(log_entry: Dict[str, Any], log_output_root: str, investigation_type: str):
+    """Like `_write_ev_log`, but the entry is only written by the next `_flush_ev_logs`."""
+    today_str = datetime.now().strftime("%d-%m-%Y")
+    log_file_path = _ev_log_path(log_output_root, today_str, log_entry, investigation_type)
+    _QUEUED_EV_LOGS.setdefault(log_file_path, []).append(log_entry)
+
+
+def _flush_ev_logs():
+    """Writes the queued log entries, with one append per log file."""
+    for log_file_path, log_entries in _QUEUED_EV_LOGS.items():
+        _append_ev_logs(log_file_path, log_entries)
+    _QUEUED_EV_LOGS.clear()
 
 # --- NEW FUNCTION TO WRITE APPEARANCE LOG ---
 def write_appearance_log_immediately(log_entry: Dict[str, Any], log_output_root: str):
@@ -375,7 +553,7 @@ def analyze_ev_appearance(
     with the odds from the previous cycle.
     """
     odd_name = current_opportunity['odd_name']
-    market_set = next((ms for ms in MARKET_SETS.values() if odd_name in ms), None)
+    market_set = market_set_of(odd_name)
     if not market_set: return None
 
     matches_by_src_current = {m['source']: m for m in current_match_group}
@@ -456,42 +634,33 @@ def _resolve_disappearance(
             try:
                 appeared_at_dt = datetime.fromisoformat(final_log["appeared_at"])
                 date_folder_str = appeared_at_dt.strftime("%d-%m-%Y")
-                overprice_source_folder = final_log["overprice_source"]
-                odd_name_sanitized = final_log['odd_name'].replace('/', '_')
-                group_id_from_log = final_log['group_id']
-
-                log_dir = os.path.join(
-                    log_output_root, MODE_NAME, EV_SOURCE, SPORT_NAME, date_folder_str,
-                    overprice_source_folder, group_id_from_log, "appearance_investigations"
-                )
-                log_file_path = os.path.join(log_dir, f"{odd_name_sanitized}.json")
+                log_file_path = _ev_log_path(log_output_root, date_folder_str, final_log, "appearance_investigations")
+                _migrate_legacy_ev_log(log_file_path)
 
                 # 2. Read the file, find the specific log by its 'appeared_at' key, update it, and write back.
                 if os.path.exists(log_file_path):
-                    with open(log_file_path, "r+", encoding="utf-8") as f:
-                        logs = json.load(f)
-                        log_updated = False
-                        for i, existing_log in enumerate(logs):
-                            if existing_log.get("appeared_at") == final_log["appeared_at"]:
-                                logs[i] = final_log  # Replace the old log with the updated one
-                                log_updated = True
-                                break
-
-                        if log_updated:
-                            f.seek(0)  # Go to the start of the file
-                            json.dump(logs, f, indent=2, ensure_ascii=False)
-                            f.truncate()  # Remove any trailing old data if the new file is smaller
-                            print(f"[EV_LOG] Finalized (updated) appearance investigation for {unique_id}.")
-                        else:
-                            # Fallback: if not found, append it (should not happen in normal flow)
-                            _write_ev_log(final_log, log_output_root, "appearance_investigations")
-                            print(f"[EV_LOG_WARN] Could not find original log for {unique_id}; appended a new one.")
+                    logs = list(read_ev_logs(log_file_path))
+                    log_updated = False
+                    for i, existing_log in enumerate(logs):
+                        if existing_log.get("appeared_at") == final_log["appeared_at"]:
+                            logs[i] = final_log  # Replace the old log with the updated one
+                            log_updated = True
+                            break
+
+                    if log_updated:
+                        with open(log_file_path, "wb") as f:
+                            f.write(_dump_jsonl(logs))
+                        print(f"[EV_LOG] Finalized (updated) appearance investigation for {unique_id}.")
+                    else:
+                        # Fallback: if not found, append it (should not happen in normal flow)
+                        _write_ev_log(final_log, log_output_root, "appearance_investigations")
+                        print(f"[EV_LOG_WARN] Could not find original log for {unique_id}; appended a new one.")
                 else:
                     # Fallback: file doesn't exist, so create it (should not happen in normal flow)
                     _write_ev_log(final_log, log_output_root, "appearance_investigations")
                     print(f"[EV_LOG_WARN] Log file for {unique_id} not found; created a new one.")
 
-            except (IOError, json.JSONDecodeError, KeyError) as e:
+            except (IOError, orjson.JSONDecodeError, KeyError) as e:
                 print(f"[EV_LOG_ERROR] Failed to update appearance log file for {unique_id}. Error: {e}")
 
             return True, None
@@ -500,7 +669,7 @@ def _resolve_disappearance(
     match_group = all_match_groups_by_id[group_id]
     matches_by_src = {m['source']: m for m in match_group}
     odd_name = last_known_opp["odd_name"]
-    market_set = next((ms for ms in MARKET_SETS.values() if odd_name in ms), None)
+    market_set = market_set_of(odd_name)
     if not market_set: return False, None
 
     new_fair_odd_val = None
@@ -542,7 +711,7 @@ def _resolve_disappearance(
         "away_team": last_known_opp.get("away_team"),
         "disappeared_at": datetime.now().isoformat(),
     }
-    _write_ev_log(log_entry, log_output_root, "disappearance_investigations")
+    _queue_ev_log(log_entry, log_output_root, "disappearance_investigations")
     return True, log_entry
 
 
@@ -550,66 +719,103 @@ def handle_opportunity_lifecycle(
     all_match_groups_by_id: Dict[str, List[Dict]],
     pending_investigations: Dict[str, Any],
     log_output_root: str,
-    activity_data: Dict[str, Any]
+    activity_data: Dict[str, Any],
+    new_investigations: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
+    """
+    Runs the pending investigations, followed by the new ones (which take precedence over
+    a pending investigation of the same uid), and returns those that are still pending.
+    """
     if not OVERPRICE_SOURCE_LOGGING: return {}
-    now = datetime.now()
+    new_investigations = new_investigations or {}
+    # "disappeared_at" is in epoch seconds, investigations that disappeared before the cutoff timed out
+    timeout_cutoff = datetime.now().timestamp() - INVESTIGATION_TIMEOUT_MINUTES * 60
     updated_pending = {}
-    for uid, pending_data in pending_investigations.items():
-        disappeared_time = datetime.fromisoformat(pending_data["disappeared_at"])
-        if (now - disappeared_time) > timedelta(minutes=INVESTIGATION_TIMEOUT_MINUTES):
-            print(f"[EV_LOG] Investigation for {uid} timed out after {INVESTIGATION_TIMEOUT_MINUTES} minutes.")
-            continue
-        resolved, log_entry = _resolve_disappearance(
-            pending_data["last_known_opp"], all_match_groups_by_id, log_output_root
-        )
-        if resolved:
-            if log_entry:
-                print(f"[EV_LOG] Resolved and logged disappearance for {uid}.")
-        else:
-            updated_pending[uid] = pending_data
+    all_items_to_process = itertools.chain(
+        ((uid, data) for uid, data in pending_investigations.items() if uid not in new_investigations),
+        new_investigations.items()
+    )
+    try:
+        for uid, pending_data in all_items_to_process:
+            disappeared_at = pending_data["disappeared_at"]
+            if isinstance(disappeared_at, str):
+                # Investigations saved by older versions hold an ISO string, it is converted once.
+                # A new dict, so the cache diff sees the entry changed and saves it converted.
+                disappeared_at = datetime.fromisoformat(disappeared_at).timestamp()
+                pending_data = {**pending_data, "disappeared_at": disappeared_at}
+            if disappeared_at < timeout_cutoff:
+                print(f"[EV_LOG] Investigation for {uid} timed out after {INVESTIGATION_TIMEOUT_MINUTES} minutes.")
+                continue
+            resolved, log_entry = _resolve_disappearance(
+                pending_data["last_known_opp"], all_match_groups_by_id, log_output_root
+            )
+            if resolved:
+                if log_entry:
+                    print(f"[EV_LOG] Resolved and logged disappearance for {uid}.")
+            else:
+                updated_pending[uid] = pending_data
+    finally:
+        # The disappearances resolved in this pass are written together, one append per log file
+        _flush_ev_logs()
+
     return updated_pending
 
 
+_LEGACY_LIFECYCLE_CACHE_FILES = {
+    "opportunities": "ev_opportunity_cache.json",
+    "purgatory": "purgatory_cache.json",
+    "pending": "pending_investigations.json",
+}
+
+
 def manage_ev_lifecycle(
     current_opportunities_cache: Dict[str, Any],
-    all_match_groups_by_id: Dict[str, List[Dict]],
+    get_match_groups_by_id: Callable[[], Dict[str, List[Dict]]],
     output_dir: str,
     log_output_root: str,
     activity_data: Dict[str, Any]
 ):
     """
     Manages the EV opportunity lifecycle, now accepting activity_data to pass to sub-functions.
+    get_match_groups_by_id returns the current cycle's groups by id, it is only called when
+    there are investigations to run.
     """
     if not OVERPRICE_SOURCE_LOGGING:
         return
 
     cache_dir = os.path.join(output_dir, "_cache")
     os.makedirs(cache_dir, exist_ok=True)
-    EV_OPP_CACHE_PATH = os.path.join(cache_dir, "ev_opportunity_cache.json")
-    PURGATORY_CACHE_PATH = os.path.join(cache_dir, "purgatory_cache.json")
-    PENDING_INVESTIGATIONS_PATH = os.path.join(cache_dir, "pending_investigations.json")
-
-    previous_opp_cache = load_json_from_file(EV_OPP_CACHE_PATH)
-    purgatory_cache = load_json_from_file(PURGATORY_CACHE_PATH)
-    pending_investigations = load_json_from_file(PENDING_INVESTIGATIONS_PATH)
+    # The three lifecycle caches share one snapshot and one journal, so a cycle saves them in one write
+    LIFECYCLE_CACHE_PATH = os.path.join(cache_dir, "ev_lifecycle_cache.json")
+    if os.path.exists(LIFECYCLE_CACHE_PATH):
+        caches = load_journaled_json(LIFECYCLE_CACHE_PATH, tuple(_LEGACY_LIFECYCLE_CACHE_FILES))
+    else:
+        # Older versions saved each cache to its own file
+        caches = {
+            section: load_json_from_file(os.path.join(cache_dir, filename))
+            for section, filename in _LEGACY_LIFECYCLE_CACHE_FILES.items()
+        }
+    previous_opp_cache = caches["opportunities"]
+    purgatory_cache = caches["purgatory"]
+    pending_investigations = caches["pending"]
     print(f"[EV_LOG] Loaded {len(previous_opp_cache)} cached opps, {len(purgatory_cache)} in purgatory, {len(pending_investigations)} pending.")
 
-    items_to_investigate_now = {}
-    for uid, last_known_opp in purgatory_cache.items():
-        if uid not in current_opportunities_cache:
-            items_to_investigate_now[uid] = {
-                "disappeared_at": datetime.now().isoformat(),
-                "last_known_opp": last_known_opp
-            }
+    # Both the purgatory and the previous cycle's opportunities are checked against the current ids
+    current_ids = current_opportunities_cache.keys()
+    disappeared_at = datetime.now().timestamp()
+    items_to_investigate_now = {
+        uid: {"disappeared_at": disappeared_at, "last_known_opp": last_known_opp}
+        for uid, last_known_opp in purgatory_cache.items()
+        if uid not in current_ids
+    }
     if items_to_investigate_now:
         print(f"[EV_LOG] {len(items_to_investigate_now)} opps from purgatory confirmed disappeared; queuing for investigation.")
 
     next_run_purgatory_cache = {}
-    disappeared_this_cycle_ids = set(previous_opp_cache.keys()) - set(current_opportunities_cache.keys())
-    for uid in disappeared_this_cycle_ids:
-        # Get the last known data for the opportunity that just disappeared.
-        last_known_opp = previous_opp_cache[uid]
+    # Walking the items finds each disappeared opportunity's last known data without a second lookup
+    for uid, last_known_opp in previous_opp_cache.items():
+        if uid in current_ids:
+            continue
 
         # MODIFICATION: Check the (un-pruned) activity_data passed from main.py
         # for an appearance log. If it exists, inject it into the opportunity's
@@ -622,18 +828,22 @@ def manage_ev_lifecycle(
     if next_run_purgatory_cache:
         print(f"[EV_LOG] {len(next_run_purgatory_cache)} new opps disappeared; moved to purgatory for next cycle.")
 
-    all_items_to_process = {**pending_investigations, **items_to_investigate_now}
-    if all_items_to_process:
+    # Both dicts are walked in turn, no merged copy of the pending investigations is built
+    if pending_investigations or items_to_investigate_now:
         updated_pending = handle_opportunity_lifecycle(
-            all_match_groups_by_id,
-            all_items_to_process,
+            get_match_groups_by_id(),
+            pending_investigations,
             log_output_root,
-            activity_data
+            activity_data,
+            new_investigations=items_to_investigate_now
         )
     else:
         updated_pending = {}
 
-    save_json_to_file(EV_OPP_CACHE_PATH, current_opportunities_cache)
-    save_json_to_file(PURGATORY_CACHE_PATH, next_run_purgatory_cache)
-    save_json_to_file(PENDING_INVESTIGATIONS_PATH, updated_pending)
+    # Only the changes since the caches were loaded are written (see save_journaled_json)
+    save_journaled_json(LIFECYCLE_CACHE_PATH, caches, {
+        "opportunities": current_opportunities_cache,
+        "purgatory": next_run_purgatory_cache,
+        "pending": updated_pending,
+    })
     print(f"[EV_LOG] Saved: {len(current_opportunities_cache)} active, {len(next_run_purgatory_cache)} to purgatory, {len(updated_pending)} pending.")
\ No newline at end of file
@@ -1,10 +1,13 @@
 # file_utils.py
 
 import os
+import sys
 import shutil
-import json
+import orjson
+from functools import lru_cache
 from datetime import datetime, timezone
-from typing import Dict, Any, Set, List, Tuple, Optional
+from zoneinfo import ZoneInfo
+from typing import Dict, Any, FrozenSet, Set, List, Tuple, Optional
 
 # Import `canonical` from matcher.py (ensure matcher.py is in the same directory or on PYTHONPATH)
 from matcher import canonical
@@ -37,33 +40,81 @@ def cleanup_old_files(output_dir: str, updated_filenames: Set[str]):
     # Create a set of all files that should be preserved.
     files_to_preserve = updated_filenames | {"activity_tracker.json", "unconfirmed_opportunities.json"}
 
-    for filename in os.listdir(output_dir):
-        # Only clean up .json files, leave other files/folders (like _cache) alone
-        if filename.lower().endswith('.json'):
-            # Check against the full set of preserved files.
-            if filename not in files_to_preserve:
-                try:
-                    file_path = os.path.join(output_dir, filename)
-                    os.remove(file_path)
-                    print(f"Deleted stale file: {filename}")
-                    deleted_count += 1
-                except OSError as e:
-                    print(f"Error deleting file {filename}: {e}")
+    with os.scandir(output_dir) as entries:
+        # Only clean up .json files, leave other files/folders (like _cache) alone,
+        # and check against the full set of preserved files.
+        stale_entries = [
+            entry for entry in entries
+            if entry.name.lower().endswith('.json') and entry.name not in files_to_preserve and entry.is_file()
+        ]
+    if not stale_entries:
+        return
+
+    # Unlink relative to one open directory handle (unlinkat) where the platform allows it,
+    # so the directory path is not resolved again for every file of the batch
+    dir_fd = os.open(output_dir, os.O_RDONLY) if os.unlink in os.supports_dir_fd else None
+    try:
+        for entry in stale_entries:
+            try:
+                if dir_fd is None:
+                    os.remove(entry.path)
+                else:
+                    os.unlink(entry.name, dir_fd=dir_fd)
+                print(f"Deleted stale file: {entry.name}")
+                deleted_count += 1
+            except OSError as e:
+                print(f"Error deleting file {entry.name}: {e}")
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
     if deleted_count > 0:
         print(f"Deleted {deleted_count} old file(s).")
 
 
-def load_matches(filename: str) -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
+def load_matches(
+    filename: str, source_name: Optional[str] = None, cache: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
     """
     Load matches from a JSON file and extracts the 'last_updated' timestamp.
-    Injects "country" and "country_name" fields into each match.
+    Injects "country" and "country_name" fields into each match, and "source" when source_name is given.
     Returns a tuple: (list of match dictionaries, last_updated_datetime).
+    With cache, a file whose modification time and size are unchanged since it was last loaded is not
+    parsed again: the matches loaded then are returned, so callers must not alter the list.
+    The cache belongs to the calling process, matching pool workers load with cache=False.
     """
+    if not cache:
+        return _parse_matches_file(filename, source_name)
+    key = (filename, source_name)
+    try:
+        st = os.stat(filename)
+    except OSError as e:
+        _parsed_files.pop(key, None)
+        print(f"Warning: Could not open file {filename}: {e}. Skipping this file.")
+        return [], None
+    cached = _parsed_files.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    result = _parse_matches_file(filename, source_name)
+    _parsed_files[key] = (st.st_mtime_ns, st.st_size, result)
+    return result
+
+
+# (filename, source_name) -> (mtime_ns, size, parsed file) of the last load_matches parse.
+# Keyed by path, so a rewritten file replaces its previous parse instead of piling up next to it.
+_parsed_files: Dict[Tuple[str, Optional[str]], Tuple[int, int, Tuple[List[Dict[str, Any]], Optional[datetime]]]] = {}
+
+
+def _parse_matches_file(
+    filename: str, source_name: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
+    """Parses a source file for `load_matches`."""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
+        # Read into memory rather than mmap: scrapers rewrite these files in place, and a
+        # mapping of a file truncated underneath it faults instead of raising an error
+        with open(filename, 'rb') as f:
             try:
-                data = json.load(f)
-            except json.JSONDecodeError as e:
+                data = orjson.loads(f.read())
+            except orjson.JSONDecodeError as e:
                 print(f"Warning: Could not parse JSON file {filename}: {e}. Skipping this file.")
                 return [], None
     except (IOError, OSError) as e:
@@ -72,8 +123,9 @@ def load_matches(filename: str) -> Tuple[List[Dict[str, Any]], Optional[datetime
 
     matches = []
     last_updated_dt = None
-    base_filename = os.path.splitext(os.path.basename(filename))[0]
-    canonical_country = canonical(base_filename)
+    # Interned so every match of every source shares one object per country string
+    base_filename = sys.intern(os.path.splitext(os.path.basename(filename))[0])
+    canonical_country = sys.intern(canonical(base_filename))
 
     # Function to parse the timestamp string into a datetime object
     def parse_timestamp(ts_str):
@@ -85,63 +137,75 @@ def load_matches(filename: str) -> Tuple[List[Dict[str, Any]], Optional[datetime
 
     # Handle different possible JSON structures (list or dict)
     if isinstance(data, list):
-        # Look for the last_updated dict, which is often at the start
-        temp_data_list = []
+        # Look for the last_updated dict, which is often at the start. The list is not
+        # copied, the loop below skips that entry.
         for item in data:
             if isinstance(item, dict) and 'last_updated' in item:
                 last_updated_dt = parse_timestamp(item['last_updated'])
-            else:
-                temp_data_list.append(item)
-        data = temp_data_list # The rest of the list is data
     elif isinstance(data, dict) and 'last_updated' in data:
         last_updated_dt = parse_timestamp(data.pop('last_updated'))
 
+    # The injected fields are the same for every match of a tournament: build them once
+    # and apply them with a single dict.update per match.
+    def tournament_fields(tournament_id, tournament_name, file_last_updated=None):
+        fields = {"country": canonical_country, "country_name": base_filename}
+        if tournament_id: fields["tournament_id"] = tournament_id
+        if tournament_name: fields["tournament_name"] = tournament_name
+        if file_last_updated: fields["file_last_updated"] = file_last_updated
+        if source_name: fields["source"] = source_name
+        return fields
+
     # Process the remaining data which should contain matches
     if isinstance(data, dict):
         # Case: Root is a single tournament object
-        tournament_id = data.get("tournament_id")
-        tournament_name = data.get("tournament_name")
         match_list = data.get("matches", [data] if "match_id" in data else [])
 
+        fields = tournament_fields(data.get("tournament_id"), data.get("tournament_name"))
         for match in match_list:
-            match["country"] = canonical_country
-            match["country_name"] = base_filename
-            if tournament_id: match["tournament_id"] = tournament_id
-            if tournament_name: match["tournament_name"] = tournament_name
+            match.update(fields)
         matches.extend(match_list)
 
     elif isinstance(data, list):
         # Case: Root is a list of tournaments or matches
         for element in data:
+            if isinstance(element, dict) and 'last_updated' in element:
+                continue
             if isinstance(element, dict) and "matches" in element:
-                tournament_id = element.get("tournament_id")
-                tournament_name = element.get("tournament_name")
+                fields = tournament_fields(element.get("tournament_id"), element.get("tournament_name"), last_updated_dt)
                 for match in element["matches"]:
-                    match["country"] = canonical_country
-                    match["country_name"] = base_filename
-                    if tournament_id: match["tournament_id"] = tournament_id
-                    if tournament_name: match["tournament_name"] = tournament_name
-                    if last_updated_dt: match['file_last_updated'] = last_updated_dt
+                    match.update(fields)
                 matches.extend(element["matches"])
             elif isinstance(element, dict) and "match_id" in element:
-                element["country"] = canonical_country
-                element["country_name"] = base_filename
-                if last_updated_dt: element['file_last_updated'] = last_updated_dt
+                element.update(tournament_fields(None, None, last_updated_dt))
                 matches.append(element)
 
     return matches, last_updated_dt
 
 
 # --- The rest of the file_utils.py remains unchanged ---
+@lru_cache(maxsize=64)
+def _dir_index(dir_path: str, mtime_ns: int) -> Tuple[FrozenSet[str], Tuple[Tuple[str, str], ...]]:
+    """
+    Lists dir_path once: the set of its entry names, and its .json files in listing order
+    as (lowercased name, name) pairs. mtime_ns is only part of the cache key, so the
+    index is rebuilt whenever files are added to or removed from the directory.
+    """
+    with os.scandir(dir_path) as entries:
+        names = [entry.name for entry in entries]
+    json_files = tuple((name.lower(), name) for name in names if name.lower().endswith('.json'))
+    return frozenset(names), json_files
+
+
 def find_actual_filename(base: str, dir_path: str) -> str | None:
     """
     Given a base name (possibly a synonym) and a directory path,
     returns the actual filename (with .json) if it exists in dir_path.
     """
+    names, json_files = _dir_index(dir_path, os.stat(dir_path).st_mtime_ns)
+
     primary = canonical(base)
     want = primary + ".json"
-    candidate_path = os.path.join(dir_path, want)
-    if os.path.exists(candidate_path):
+    if want in names:
         return want
 
     from matcher import SYN_GROUPS  # noqa: E402
@@ -149,11 +213,12 @@ def find_actual_filename(base: str, dir_path: str) -> str | None:
     if group:
         for syn in group:
             fname = syn + ".json"
-            if os.path.exists(os.path.join(dir_path, fname)):
+            if fname in names:
                 return fname
 
-    for fn in os.listdir(dir_path):
-        if fn.lower().endswith('.json') and base.lower() in fn.lower():
+    base_lower = base.lower()
+    for fn_lower, fn in json_files:
+        if base_lower in fn_lower:
             return fn
 
     return None
@@ -168,12 +233,12 @@ def get_all_canonical_countries(source_directories: List[tuple[str, str]]) -> Se
     for _, source_dir in source_directories:
         if not os.path.isdir(source_dir):
             continue
-        for fname in os.listdir(source_dir):
-            if not fname.lower().endswith('.json'):
-                continue
-            raw = os.path.splitext(fname)[0]
-            canon = canonical(raw)
-            all_countries.add(canon)
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.json') or not entry.is_file():
+                    continue
+                raw = entry.name[:-5]  # strip ".json"
+                all_countries.add(canonical(raw))
 
     return all_countries
 
@@ -192,12 +257,13 @@ def get_country_file_paths(
             continue
 
         matching_files: List[str] = []
-        for fname in os.listdir(src_dir):
-            if not fname.lower().endswith('.json'):
-                continue
-            raw = os.path.splitext(fname)[0]
-            if canonical(raw) == country_name:
-                matching_files.append(os.path.join(src_dir, fname))
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.json') or not entry.is_file():
+                    continue
+                raw = entry.name[:-5]  # strip ".json"
+                if canonical(raw) == country_name:
+                    matching_files.append(entry.path)
 
         if matching_files:
             paths[src_name] = matching_files
@@ -205,29 +271,79 @@ def get_country_file_paths(
     return paths
 
 
+def build_country_index(source_directories: List[tuple[str, str]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Scan each source directory once and group its .json files by canonical country name.
+    Returns {country_name: {src_name: [file paths]}}, where every country maps to what
+    `get_country_file_paths` would return for it.
+    """
+    index: Dict[str, Dict[str, List[str]]] = {}
+
+    for src_name, src_dir in source_directories:
+        if not os.path.isdir(src_dir):
+            continue
+
+        files_by_country = _files_by_country(src_dir, os.stat(src_dir).st_mtime_ns)
+        for country_name, matching_files in files_by_country.items():
+            index.setdefault(country_name, {})[src_name] = matching_files
+
+    return index
+
+
+@lru_cache(maxsize=64)
+def _files_by_country(src_dir: str, mtime_ns: int) -> Dict[str, List[str]]:
+    """
+    Groups the .json files of src_dir by canonical country name. mtime_ns is only part of the
+    cache key: the directory is scanned again once files are added, removed or renamed in it,
+    files updated in place keep their entry. The lists are shared, callers must not alter them.
+    """
+    files_by_country: Dict[str, List[str]] = {}
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith('.json') or not entry.is_file():
+                continue
+            raw = entry.name[:-5]  # strip ".json"
+            files_by_country.setdefault(canonical(raw), []).append(entry.path)
+    return files_by_country
+
+
 def load_activity_data(tracker_path: str) -> Dict[str, str]:
     """
     Loads the activity tracker data from a JSON file.
-    The data is a dictionary mapping unique_id -> first_seen_timestamp (ISO format).
+    The data is a dictionary mapping unique_id -> tracking info, whose "first_seen" is in epoch seconds.
     Returns an empty dictionary if the file doesn't exist or is invalid.
     """
     if not os.path.exists(tracker_path):
         return {}
     try:
-        with open(tracker_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        with open(tracker_path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError) as e:
         print(f"Warning: Could not load or parse activity tracker file {tracker_path}. Starting fresh. Error: {e}")
         return {}
 
+    # Trackers saved by older versions hold "first_seen" as an ISO string
+    for entry in data.values():
+        first_seen = entry.get("first_seen") if isinstance(entry, dict) else None
+        if isinstance(first_seen, str):
+            first_seen_dt = datetime.fromisoformat(first_seen)
+            if first_seen_dt.tzinfo is None:
+                first_seen_dt = first_seen_dt.replace(tzinfo=ZoneInfo("Etc/GMT-1"))
+            entry["first_seen"] = first_seen_dt.timestamp()
+    return data
+
 
 def save_activity_data(tracker_path: str, data: Dict[str, str]):
     """
     Saves the activity tracker data to a JSON file.
+    The data is written compactly to a temporary file that then replaces the tracker,
+    so a crash mid-write never leaves a truncated tracker behind.
     """
+    tmp_path = tracker_path + ".tmp"
     try:
-        with open(tracker_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, tracker_path)
     except IOError as e:
         print(f"Error: Could not save activity tracker file to {tracker_path}. Error: {e}")
 
@@ -240,27 +356,124 @@ def load_json_from_file(file_path: str) -> Dict[str, Any]:
     if not os.path.exists(file_path):
         return {}
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
+        with open(file_path, "rb") as f:
             content = f.read()
             if not content: return {}
-            return json.loads(content)
-    except (json.JSONDecodeError, IOError) as e:
+            return orjson.loads(content)
+    except (orjson.JSONDecodeError, IOError) as e:
         print(f"Warning: Could not load or parse cache file {file_path}. Starting fresh. Error: {e}")
         return {}
 
 
 def save_json_to_file(file_path: str, data: Dict[str, Any]):
     """
-    Saves a dictionary to a JSON file with indentation, used for caching.
+    Saves a dictionary to a compact JSON file, used for caching.
+    orjson writes datetimes (e.g. file_last_updated) as ISO 8601 natively.
+    Like the activity tracker, the file is replaced by a fully written temporary file,
+    so a crash or a concurrent reader never sees it truncated. The caches are rebuilt
+    every cycle, so they are not fsynced.
     """
-    def json_serializer(obj):
-        """JSON serializer for objects not serializable by default json code"""
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Type {type(obj)} not serializable")
+    tmp_path = file_path + ".tmp"
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=json_serializer)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, file_path)
+    except IOError as e:
+        print(f"Error: Could not save cache file to {file_path}. Error: {e}")
+
+
+def _journal_path(file_path: str) -> str:
+    return os.path.splitext(file_path)[0] + ".journal.ndjson"
+
+
+# Snapshot key (and key of the state returned by load_journaled_json) holding the journal generation
+JOURNAL_GENERATION_KEY = "_gen"
+# Key of the state returned by load_journaled_json, set when its journal could not be fully replayed
+JOURNAL_TORN_KEY = "_torn"
+
+
+def load_journaled_json(file_path: str, sections: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads dictionary caches saved together by `save_journaled_json`, as {section: {key: value}}:
+    the JSON snapshot, then the put/del operations appended to its journal since the snapshot was written.
+    Operations from an older generation than the snapshot's are left over from before it and skipped.
+    The generation is returned under JOURNAL_GENERATION_KEY, for the next save. If the journal cannot be
+    fully replayed, JOURNAL_TORN_KEY is set too, so the next save writes a fresh snapshot.
+    """
+    snapshot = load_json_from_file(file_path)
+    generation = snapshot.get(JOURNAL_GENERATION_KEY, 0)
+    data = {section: snapshot.get(section, {}) for section in sections}
+    data[JOURNAL_GENERATION_KEY] = generation
+    journal_path = _journal_path(file_path)
+    if not os.path.exists(journal_path):
+        return data
+    try:
+        with open(journal_path, "rb") as f:
+            for line in f:
+                if not line.strip(): continue
+                op = orjson.loads(line)
+                if op.get("g", 0) != generation: continue
+                cache = data.get(op["s"])
+                if not isinstance(cache, dict): continue
+                if op["op"] == "put":
+                    cache[op["k"]] = op["v"]
+                else:
+                    cache.pop(op["k"], None)
+    except (orjson.JSONDecodeError, IOError, KeyError) as e:
+        # A torn line (crash mid-append) loses the operations from that line on. Appending after it
+        # would lose every later save too, so the next save compacts the journal away instead.
+        print(f"Warning: Could not fully replay cache journal {journal_path}. Error: {e}")
+        data[JOURNAL_TORN_KEY] = True
+    return data
+
+
+def save_journaled_json(file_path: str, previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]):
+    """
+    Saves several dictionary caches ({section: {key: value}}) as one JSON snapshot plus one append-only journal.
+    `previous` must be the state `load_journaled_json` returned for file_path: only the keys added,
+    changed or removed since then are appended, all sections in a single write. Once the journal has
+    grown larger than the snapshot, or could not be fully replayed by the load,
+    the current state is written as the new snapshot instead.
+    """
+    journal_path = _journal_path(file_path)
+    snapshot_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    journal_size = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+    generation = previous.get(JOURNAL_GENERATION_KEY, 0)
+
+    if not snapshot_size or journal_size > snapshot_size or previous.get(JOURNAL_TORN_KEY):
+        # The new snapshot starts a new generation and fully replaces the old one before the journal
+        # is removed. A crash in between leaves only older-generation operations, which are skipped on load.
+        snapshot = {**current, JOURNAL_GENERATION_KEY: generation + 1}
+        tmp_path = file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(snapshot, option=orjson.OPT_NON_STR_KEYS))
+            os.replace(tmp_path, file_path)
+        except IOError as e:
+            # The old snapshot and its journal are left untouched
+            print(f"Error: Could not save cache file to {file_path}. Error: {e}")
+            return
+        if journal_size:
+            os.remove(journal_path)
+        return
+
+    ops = []
+    for section, cache in current.items():
+        previous_cache = previous.get(section, {})
+        ops.extend({"op": "del", "g": generation, "s": section, "k": key} for key in previous_cache.keys() - cache.keys())
+        ops.extend(
+            {"op": "put", "g": generation, "s": section, "k": key, "v": value}
+            for key, value in cache.items()
+            if key not in previous_cache or previous_cache[key] != value
+        )
+    if not ops:
+        return
+    try:
+        with open(journal_path, "ab") as f:
+            f.write(b"".join(
+                orjson.dumps(op, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS) for op in ops
+            ))
     except IOError as e:
-        print(f"Error: Could not save cache file to {file_path}. Error: {e}")
\ No newline at end of file
+        print(f"Error: Could not append to cache journal {journal_path}. Error: {e}")
@@ -1,10 +1,19 @@
 # main.py
 
 import os
-import json
+import sys
+import queue
+import orjson
+import atexit
 import shutil
 import time
+import logging
+import logging.handlers
 import argparse
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from supabase_exporter import SupabaseExporter
@@ -18,12 +27,10 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 EXPORT_TO_SUPABASE = bool(SUPABASE_URL and SUPABASE_KEY)
 
-supabase_exporter = None
-if EXPORT_TO_SUPABASE:
-    supabase_exporter = SupabaseExporter(SUPABASE_URL, SUPABASE_KEY)
-    print('[SUPABASE] Export is ENABLED')
-else:
-    print('[SUPABASE] Export is DISABLED (SUPABASE_URL/SUPABASE_KEY not set)')
+# Country files are written compact; set PRETTY_OUTPUT=1 to indent them for debugging
+OUTPUT_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if os.getenv('PRETTY_OUTPUT') == '1' else 0)
+
+supabase_exporter = None  # created by start_main_process
 
 
 # ----- Choose default configuration ---------------------------------------
@@ -33,6 +40,7 @@ CHECKING_MODE = "arb"  # "arb" for arbitrage or "ev" for expected value
 LOOP = False  # choose the default loop state
 DELAY = 1  # choose the default delay between checking cycles
 SHOW_ONLY_CONFIRMED = False  # default for the new confirmation logic
+MATCHING_WORKERS = 0  # processes matching countries in parallel (0 = one per CPU, 1 = no pool, keeps the parse cache)
 REVERSE_CHECKING = False  # default for reverse checking
 # --------------------------------------------------------------------------
 
@@ -74,6 +82,15 @@ parser.add_argument(
     "--prune-remote", action="store_true", default=False,
     help="If set, delete remote files under the uploads prefix that are not present locally (use with care)."
 )
+parser.add_argument(
+    "--matching-workers", type=int, default=MATCHING_WORKERS,
+    help=f"Number of processes matching countries in parallel, 0 for one per CPU (default : {MATCHING_WORKERS}). "
+         "With 1, source files unchanged since the last cycle are not parsed again"
+)
+parser.add_argument(
+    "--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO",
+    help="Level of the analysis log messages printed to the console (default : INFO)"
+)
 
 args = parser.parse_args()
 
@@ -87,15 +104,34 @@ PRUNE_REMOTE = args.prune_remote
 # --- NEW SETTING ---
 SHOW_ONLY_CONFIRMED = args.show_only_confirmed
 REVERSE_CHECKING = args.reverse_check
+LOG_LEVEL = args.log_level
+MATCHING_WORKERS = args.matching_workers or os.cpu_count() or 1
 # --------------------------------------------------------------------
 
 
+# ----- Logging -----
+def configure_worker_logging():
+    """Logs straight to stdout, used in analysis pool workers."""
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s", stream=sys.stdout, force=True)
+
+
+def configure_main_logging():
+    """
+    Calculator log records are handed to a background listener, the analysis loop only enqueues them.
+    """
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s", handlers=[logging.handlers.QueueHandler(log_queue)], force=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+
 # ----- Load and Override Synonyms in matcher -----
 import matcher
 
 SYN_PATH = os.path.join("settings", SPORT, "synonyms.json")
-with open(SYN_PATH, encoding="utf-8") as syn_file:
-    syn_conf = json.load(syn_file)
+with open(SYN_PATH, "rb") as syn_file:
+    syn_conf = orjson.loads(syn_file.read())
 matcher.SYN_GROUPS = syn_conf.get("synonyms", [])
 matcher.SYN_PRIMARY = {
     syn: group[0]
@@ -105,8 +141,8 @@ matcher.SYN_PRIMARY = {
 
 # ----- Load Common Settings for This Sport/Mode -----
 SETTINGS_PATH = os.path.join("settings", SPORT, "settings.json")
-with open(SETTINGS_PATH, encoding="utf-8") as sf:
-    all_settings = json.load(sf)
+with open(SETTINGS_PATH, "rb") as sf:
+    all_settings = orjson.loads(sf.read())
 
 if SPORT not in all_settings:
     raise ValueError(f"Sport '{SPORT}' not found in settings.")
@@ -118,9 +154,10 @@ selected_settings = all_settings[SPORT][MODE]
 # Get the directory containing main.py to resolve relative paths
 MAIN_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Resolve paths relative to main.py's directory
+# Resolve paths relative to main.py's directory. Source names are interned: they are
+# stamped on every loaded match and used as dict keys throughout the analysis.
 SOURCE_DIRECTORIES = [
-    (entry["name"], os.path.normpath(os.path.join(MAIN_DIR, entry["path"].lstrip("./"))))
+    (sys.intern(entry["name"]), os.path.normpath(os.path.join(MAIN_DIR, entry["path"].lstrip("./"))))
     for entry in selected_settings["source_directories"]
 ]
 
@@ -132,8 +169,8 @@ matcher.DAY_DIFF_TOLERANCE = selected_settings["day_diff_tolerance"]
 
 # ----- Load Team-Matching Constants into matcher -----
 TEAM_CONF_PATH = os.path.join("settings", SPORT, "matching_helper.json")
-with open(TEAM_CONF_PATH, encoding="utf-8") as tf:
-    team_conf = json.load(tf)
+with open(TEAM_CONF_PATH, "rb") as tf:
+    team_conf = orjson.loads(tf.read())
 
 SWAP_WORDS_PATH = os.path.join("settings", SPORT, "swap_words.json")
 if os.path.exists(SWAP_WORDS_PATH):
@@ -148,9 +185,10 @@ else:
         matcher.REVERSE_CHECKING = False
 
 matcher.IMPORTANT_TERM_GROUPS = team_conf["important_terms"]
-matcher.COMMON_TEAM_WORDS = set(team_conf["common_team_words"])
-matcher.LOCATION_IDENTIFIERS = set(team_conf["location_identifiers"])
-matcher.TEAM_SYNONYMS = [set(group) for group in team_conf["team_synonyms"]]
+# Read-only lookup tables: frozen so they can't be altered by accident
+matcher.COMMON_TEAM_WORDS = frozenset(team_conf["common_team_words"])
+matcher.LOCATION_IDENTIFIERS = frozenset(team_conf["location_identifiers"])
+matcher.TEAM_SYNONYMS = tuple(frozenset(group) for group in team_conf["team_synonyms"])
 
 
 
@@ -158,8 +196,7 @@ matcher.TEAM_SYNONYMS = [set(group) for group in team_conf["team_synonyms"]]
 import arb_calculator
 import ev_calculator
 from file_utils import (
-    get_all_canonical_countries,
-    get_country_file_paths,
+    build_country_index,
     load_matches,
     cleanup_old_files,
     load_activity_data,
@@ -175,6 +212,8 @@ from utils import dedupe_all_country_files, test_team_matching
 
 # ----- Conditionally Load Mode-Specific Settings -----
 
+EV_LOG_OUTPUT_ROOT = ""  # Root of the EV investigation logs, set in EV mode when they are enabled
+
 if CHECKING_MODE == "arb":
     # Load settings for Arbitrage mode
     print("Running in Arbitrage (arb) mode.")
@@ -182,31 +221,34 @@ if CHECKING_MODE == "arb":
     OUTPUT_DIR = os.path.join(OUTPUT_DIR, MODE, SPORT)
     ARB_SETTINGS_PATH = os.path.join("settings", SPORT, "arb.json")
     if os.path.exists(ARB_SETTINGS_PATH):
-        with open(ARB_SETTINGS_PATH, encoding="utf-8") as arbf:
-            arb_settings = json.load(arbf)
+        with open(ARB_SETTINGS_PATH, "rb") as arbf:
+            arb_settings = orjson.loads(arbf.read())
         arb_calculator.MISVALUE_DETECTION_METHOD = arb_settings.get("MISVALUE_DETECTION_METHOD", "comparaison")
         arb_calculator.APPEARANCE_INVESTIGATION_LOGGING = arb_settings.get("APPEARANCE_INVESTIGATION_LOGGING", False)
         # Define the root path for the new logs
         arb_output_base = os.path.dirname(os.path.dirname(OUTPUT_DIR)) # Gets C:\...\arbitrage-viewer\public\arb_output
         arb_calculator.LOG_OUTPUT_ROOT = os.path.join(arb_output_base, "misvalue_source_log")
+        ANALYSIS_WORKERS = arb_settings.get("ANALYSIS_WORKERS", 1) or os.cpu_count() or 1
     else:
         # Fallback if arb.json doesn't exist to prevent crashes
         arb_calculator.MISVALUE_DETECTION_METHOD = "comparaison"
         arb_calculator.APPEARANCE_INVESTIGATION_LOGGING = False
         arb_calculator.LOG_OUTPUT_ROOT = ""
-    with open(os.path.join("settings", SPORT, "markets.json"), encoding="utf-8") as mfile:
-        markets_root = json.load(mfile)
-        arb_calculator.MARKET_SETS = markets_root["market_sets"]
+        ANALYSIS_WORKERS = 1
+    with open(os.path.join("settings", SPORT, "markets.json"), "rb") as mfile:
+        markets_root = orjson.loads(mfile.read())
+        arb_calculator.MARKET_SETS = {name: tuple(keys) for name, keys in markets_root["market_sets"].items()}
     arb_calculator.build_market_categories()
     URL_BUILDER_PATH = os.path.join("settings", SPORT, "url_builder.json")
-    with open(os.path.join("settings", SPORT, "full_check_markets.json"), encoding="utf-8") as fcfile:
-        fc_root = json.load(fcfile)
+    with open(os.path.join("settings", SPORT, "full_check_markets.json"), "rb") as fcfile:
+        fc_root = orjson.loads(fcfile.read())
         arb_calculator.FULL_CHECK_MARKETS = set(fc_root.get("full_check_markets", []))
-    with open(URL_BUILDER_PATH, encoding="utf-8") as url_file:
-        url_conf = json.load(url_file)
+    with open(URL_BUILDER_PATH, "rb") as url_file:
+        url_conf = orjson.loads(url_file.read())
         arb_calculator.URL_TEMPLATES = url_conf.get("url_templates", {})
         arb_calculator.SPORT_NAME = SPORT
         arb_calculator.MODE_NAME = MODE
+    arb_calculator.build_url_builders()
     analyzer_function = lambda grp, prev_data, act_data: analyze_optimal_arbitrage(
         matching_group=grp,
         previous_match_data=prev_data,
@@ -217,8 +259,8 @@ elif CHECKING_MODE == "ev":
     # Load settings for EV mode
     print("Running in Positive EV (ev) mode.")
     EV_SETTINGS_PATH = os.path.join("settings", SPORT, "ev.json")
-    with open(EV_SETTINGS_PATH, encoding="utf-8") as evf:
-        ev_settings = json.load(evf)
+    with open(EV_SETTINGS_PATH, "rb") as evf:
+        ev_settings = orjson.loads(evf.read())
     ev_source_name = ev_settings["EV_SOURCE"]
     output_directory = ev_settings["OUTPUT_DIRECTORY"]
     OUTPUT_DIR = os.path.join(output_directory, "ev_opportunities", MODE, ev_source_name, SPORT)
@@ -231,16 +273,23 @@ elif CHECKING_MODE == "ev":
     ev_calculator.ONLY_SHOW_EV_SOURCE_OPPS = ev_settings.get("ONLY_SHOW_EV_SOURCE_OPPS", False)
     ev_calculator.OVERPRICE_SOURCE_LOGGING = ev_settings.get("OVERPRICE_SOURCE_LOGGING", False)
     ev_calculator.APPEARANCE_INVESTIGATION = ev_settings.get("APPEARANCE_INVESTIGATION", False)
+    if ev_calculator.OVERPRICE_SOURCE_LOGGING:
+        EV_LOG_OUTPUT_ROOT = os.path.join(output_directory, "ev_source_log")
     ev_calculator.DOUBLE_CHECK = ev_settings.get("DOUBLE_CHECK", False)
-    with open(os.path.join("settings", SPORT, "markets.json"), encoding="utf-8") as mfile:
-        markets_root = json.load(mfile)
-        ev_calculator.MARKET_SETS = markets_root["market_sets"]
+    with open(os.path.join("settings", SPORT, "markets.json"), "rb") as mfile:
+        markets_root = orjson.loads(mfile.read())
+        ev_calculator.MARKET_SETS = {name: tuple(keys) for name, keys in markets_root["market_sets"].items()}
+    ev_calculator.intern_config()
+    ev_calculator.build_market_layout()
+    ev_calculator.build_odd_to_market()
+    ANALYSIS_WORKERS = 1  # EV analysis stays in the main process
     URL_BUILDER_PATH = os.path.join("settings", SPORT,"url_builder.json")
-    with open(URL_BUILDER_PATH, encoding="utf-8") as url_file:
-        url_conf = json.load(url_file)
+    with open(URL_BUILDER_PATH, "rb") as url_file:
+        url_conf = orjson.loads(url_file.read())
         ev_calculator.URL_TEMPLATES = url_conf.get("url_templates", {})
         ev_calculator.SPORT_NAME = SPORT
         ev_calculator.MODE_NAME = MODE
+    ev_calculator.build_url_cache()
     analyzer_function = lambda grp, prev_data, act_data: analyze_ev_opportunities(
         group=grp,
         previous_match_data=prev_data,
@@ -251,13 +300,159 @@ else:
     raise ValueError(f"Invalid CHECKING_MODE: '{CHECKING_MODE}'. Must be 'arb' or 'ev'.")
 
 
+# Hash of the content last written to each country file, so unchanged countries are not rewritten
+_country_file_hashes = {}
+
+
+def write_country_file(out_path, list_of_groups):
+    # orjson writes datetimes (e.g. file_last_updated) as ISO 8601 natively
+    content = orjson.dumps(list_of_groups, option=OUTPUT_DUMP_OPTIONS)
+    content_hash = hash(content)
+    if _country_file_hashes.get(out_path) == content_hash and os.path.exists(out_path):
+        return
+    with open(out_path, "wb") as f:
+        f.write(content)
+    _country_file_hashes[out_path] = content_hash
+
+
+# Every opportunity gets a duration each cycle, the usual strings are built once
+_SECONDS_TEXT = {s: f"{s} seconds" for s in range(61)}
+_MINUTES_TEXT = {m: f"{m} minute" if m == 1 else f"{m} minutes" for m in range(60)}
+_HOURS_TEXT = {h: f"{h} hour" if h == 1 else f"{h} hours" for h in range(49)}
+
+
+@lru_cache(maxsize=4096)
+def parse_birth_time(birth_time_str: str) -> datetime:
+    """Parses a cached unconfirmed birth time, once per string: it is re-read every cycle until confirmed."""
+    birth_time_dt = datetime.fromisoformat(birth_time_str)
+    if birth_time_dt.tzinfo is None:
+        birth_time_dt = birth_time_dt.replace(tzinfo=ZoneInfo("Etc/GMT-1"))
+    return birth_time_dt
+
+
 def format_duration(total_seconds: float) -> str:
     """Formats a duration in seconds into a human-readable string."""
-    if total_seconds < 60: return f"{round(total_seconds)} seconds"
+    if total_seconds < 60:
+        seconds = round(total_seconds)
+        return _SECONDS_TEXT.get(seconds) or f"{seconds} seconds"
     minutes = round(total_seconds / 60)
-    if minutes < 60: return f"{minutes} minute" if minutes == 1 else f"{minutes} minutes"
+    if minutes < 60: return _MINUTES_TEXT[minutes]
     hours = round(minutes / 60)
-    return f"{hours} hour" if hours == 1 else f"{hours} hours"
+    return _HOURS_TEXT.get(hours) or f"{hours} hours"
+
+
+# Country files are read and written concurrently by these threads, created by start_main_process
+IO_EXECUTOR = None
+_worker_pool = None
+
+
+def get_worker_pool():
+    """
+    The process pool shared by country matching and arbitrage analysis, created on first use and
+    kept across cycles. One pool keeps the two from running more processes than CPUs.
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = ProcessPoolExecutor(
+            max_workers=max(ANALYSIS_WORKERS, MATCHING_WORKERS), initializer=configure_worker_logging
+        )
+    return _worker_pool
+
+
+def match_country(paths, map_fn=map, load_fn=load_matches):
+    """
+    Loads the files of every source of a country and finds its matching groups.
+    Returns (matching_groups, {source: latest file update}). map_fn runs load_fn over the files,
+    the I/O threads are passed in when the country is matched in the main process.
+    """
+    matches_by_source, last_updated_by_source = {}, {}
+    # map yields in submission order, i.e. source by source and file by file
+    loaded_files = map_fn(
+        load_fn,
+        [path for file_list in paths.values() for path in file_list],
+        [src_name for src_name, file_list in paths.items() for _ in file_list]
+    )
+    for src_name, file_list in paths.items():
+        entries = []
+        latest_update_for_source = None
+        for _ in file_list:
+            new_matches, updated_at = next(loaded_files)
+            entries.extend(new_matches)
+            if updated_at:
+                if not latest_update_for_source or updated_at > latest_update_for_source:
+                    latest_update_for_source = updated_at
+
+        if latest_update_for_source:
+            last_updated_by_source[src_name] = latest_update_for_source
+
+        matches_by_source[src_name] = entries
+
+    return find_all_matching_matches(matches_by_source), last_updated_by_source
+
+
+_worker_io_executor = None
+
+
+def load_matches_uncached(filename, source_name=None):
+    return load_matches(filename, source_name, cache=False)
+
+
+def match_country_in_worker(paths):
+    """
+    match_country for pool workers. The parent's I/O threads don't survive in a worker,
+    so each worker reads the files of a country with threads of its own. The pool hands a country
+    to any worker each cycle, so a worker-local parse cache would rarely hit while every worker
+    held its own copy: workers parse the files every time, the cache only serves MATCHING_WORKERS = 1.
+    """
+    global _worker_io_executor
+    if _worker_io_executor is None:
+        _worker_io_executor = ThreadPoolExecutor(max_workers=len(SOURCE_DIRECTORIES) or 1)
+    return match_country(paths, _worker_io_executor.map, load_matches_uncached)
+
+
+def match_countries(country_paths):
+    """
+    Yields the result of match_country for every country, in order. Countries are independent,
+    so with MATCHING_WORKERS > 1 they are matched in the shared pool, see match_countries_in_pool.
+    """
+    if MATCHING_WORKERS <= 1 or len(country_paths) < 2:
+        return (match_country(paths, IO_EXECUTOR.map) for paths in country_paths)
+    return match_countries_in_pool(country_paths)
+
+
+def match_countries_in_pool(country_paths):
+    """
+    Generator of match_country results for the pool. Only 2 * MATCHING_WORKERS countries are queued
+    at a time, and the next one is submitted once the previous country's results have been consumed.
+    A country's analysis tasks are queued in the same pool, so they only wait behind that window
+    instead of behind every country of the cycle, while the workers still have matching to do.
+    """
+    pool = get_worker_pool()
+    remaining_paths = iter(country_paths)
+    pending = deque(
+        pool.submit(match_country_in_worker, paths) for paths in islice(remaining_paths, 2 * MATCHING_WORKERS)
+    )
+    try:
+        while pending:
+            yield pending.popleft().result()
+            next_paths = next(remaining_paths, None)
+            if next_paths is not None:
+                pending.append(pool.submit(match_country_in_worker, next_paths))
+    finally:
+        # Countries not started yet when the cycle is aborted are dropped
+        for future in pending:
+            future.cancel()
+
+
+def analyze_matching_groups(matching_groups, prev_data, act_data):
+    """
+    Runs the analyzer on every matching group, yielding results in group order. Arbitrage
+    groups are spread over ANALYSIS_WORKERS processes when more than one is configured,
+    otherwise each group is analysed lazily as its result is consumed.
+    """
+    if ANALYSIS_WORKERS <= 1 or len(matching_groups) < 2:
+        return (analyzer_function(grp=group, prev_data=prev_data, act_data=act_data) for group in matching_groups)
+    return arb_calculator.analyze_groups_in_pool(get_worker_pool(), matching_groups, prev_data, act_data)
 
 
 # ----- Main Processing Function -----
@@ -276,64 +471,62 @@ def process_files_optimal():
     unconfirmed_opps_cache = load_json_from_file(UNCONFIRMED_OPPS_PATH)
     current_unconfirmed_opps = {}
 
+    # --- Previous match data is only cached between cycles if needed by either mode ---
+    # EV mode needs it for its appearance investigation.
+    # Arb mode needs it if the detection method is 'appearance'.
+    should_cache_for_ev = (CHECKING_MODE == "ev" and ev_calculator.APPEARANCE_INVESTIGATION)
+    should_cache_for_arb = (CHECKING_MODE == "arb" and arb_calculator.MISVALUE_DETECTION_METHOD == "appearance")
+    # The EV lifecycle also looks groups up by id in the current cycle
+    keep_match_groups = (should_cache_for_ev or should_cache_for_arb or
+                         (CHECKING_MODE == "ev" and ev_calculator.OVERPRICE_SOURCE_LOGGING))
+
     cache_dir = os.path.join(OUTPUT_DIR, "_cache")
     PREV_MATCH_DATA_PATH = os.path.join(cache_dir, "previous_match_data_cache.json")
-    previous_match_data = load_json_from_file(PREV_MATCH_DATA_PATH)
+    previous_match_data = (
+        load_json_from_file(PREV_MATCH_DATA_PATH) if should_cache_for_ev or should_cache_for_arb else {}
+    )
 
-    current_run_unique_ids, generated_files, processed_countries = set(), set(), set()
-    current_opportunities_cache, all_match_groups_by_id = {}, {}
-    log_output_root = ""
+    current_run_unique_ids, generated_files = set(), set()
+    current_opportunities_cache, matched_group_lists = {}, []
+    all_match_groups_by_id = None
+
+    def get_match_groups_by_id():
+        # Indexed on first use only: most EV lifecycle passes have nothing to look up
+        nonlocal all_match_groups_by_id
+        if all_match_groups_by_id is None:
+            all_match_groups_by_id = {
+                group[0]["matching_group_id"]: group
+                for matching_groups in matched_group_lists
+                for group in matching_groups
+                if group and group[0].get("matching_group_id")
+            }
+        return all_match_groups_by_id
 
     last_updated_times = {}
 
-    if CHECKING_MODE == "ev" and ev_calculator.OVERPRICE_SOURCE_LOGGING:
-        ev_settings_for_path = json.load(open(os.path.join("settings", SPORT, "ev.json"), encoding="utf-8"))
-        base_output_dir = ev_settings_for_path["OUTPUT_DIRECTORY"]
-        log_output_root = os.path.join(base_output_dir, "ev_source_log")
-
-    all_countries = get_all_canonical_countries(SOURCE_DIRECTORIES)
-    for country_name in sorted(all_countries):
-        if country_name in processed_countries: continue
-        processed_countries.add(country_name)
-        paths = get_country_file_paths(country_name, SOURCE_DIRECTORIES)
-        if len(paths) < 2: continue
-        matches_by_source = {}
-        for src_name, file_list in paths.items():
-            entries = []
-            latest_update_for_source = None
-            for path in file_list:
-                new_matches, updated_at = load_matches(path)
-                entries.extend(new_matches)
-                if updated_at:
-                    if not latest_update_for_source or updated_at > latest_update_for_source:
-                        latest_update_for_source = updated_at
-
-            if latest_update_for_source:
-                last_updated_times[src_name] = latest_update_for_source
-
-            for m in entries: m["source"] = src_name
-            matches_by_source[src_name] = entries
-
-        matching_groups = find_all_matching_matches(matches_by_source)
+    # One reference time for the whole cycle: birth times and activity durations of all groups use it
+    now_utc = datetime.now(ZoneInfo("Etc/GMT-1"))
+    now_ts = now_utc.timestamp()
+
+    # One directory scan per cycle, every file canonicalised once
+    country_index = build_country_index(SOURCE_DIRECTORIES)
+    # Only countries covered by at least two sources can be matched
+    country_paths = [paths for _, paths in sorted(country_index.items()) if len(paths) >= 2]
+    for matching_groups, source_updates in match_countries(country_paths):
+        last_updated_times.update(source_updates)
         total_matching_groups += len(matching_groups)
+        # --- Keep the full group data if needed later (next run's cache, EV lifecycle) ---
+        # This is used by both EV and the new Arb 'appearance' method.
+        if keep_match_groups:
+            matched_group_lists.append(matching_groups)
 
-        for group in matching_groups:
-            # --- Cache the full group data if needed for the next run ---
-            # This is used by both EV and the new Arb 'appearance' method.
-            if group:
-                group_id = group[0].get("matching_group_id")
-                if group_id:
-                    all_match_groups_by_id[group_id] = group
-
-            group_object = analyzer_function(
-                grp=group,
-                prev_data=previous_match_data,
-                act_data=activity_data
-            )
+        group_objects = analyze_matching_groups(matching_groups, previous_match_data, activity_data)
+        for group, group_object in zip(matching_groups, group_objects):
             if group_object:
                 confirmed_opportunities = []
                 opps_list = group_object.get('opportunities', [])
-                now_utc = datetime.now(ZoneInfo("Etc/GMT-1"))
+                # Latest file update of each source of the group, gathered for the first new opportunity
+                group_source_updates = None
 
                 for opp in opps_list:
                     # If the only show ev source opps setting is enabled, only proceed if the overprice source has been
@@ -351,37 +544,42 @@ def process_files_optimal():
 
                     if SHOW_ONLY_CONFIRMED:
                         is_confirmed = False
-                        birth_time_str = None
 
-                        # 1. Check if we are already tracking this opportunity
-                        if unique_id in unconfirmed_opps_cache:
-                            # It's an existing unconfirmed opportunity. Use its recorded birth time.
-                            birth_time_str = unconfirmed_opps_cache[unique_id]["birth_time"]
-                        elif unique_id in activity_data and "first_seen" in activity_data[unique_id]:
-                            # It's a previously confirmed opportunity that we are tracking.
-                            birth_time_str = activity_data[unique_id]["first_seen"]
+                        # Get involved sources based on the mode
+                        if CHECKING_MODE == "arb":
+                            involved_sources = opp.get("arbitrage_sources", "").split(", ")
+                        else:  # ev mode
+                            involved_sources = opp.get("ev_sources", [])
+
+                        # 1. Check if we are already tracking this opportunity.
+                        # The ISO string is only produced when the opportunity is cached as unconfirmed.
+                        unconfirmed_entry = unconfirmed_opps_cache.get(unique_id)
+                        birth_time_str = unconfirmed_entry["birth_time"] if unconfirmed_entry is not None else None
+                        tracked_first_seen = activity_data.get(unique_id, {}).get("first_seen")
 
                         # 2. Determine the birth_time datetime object
                         if birth_time_str:
-                            # Load the existing timestamp
-                            birth_time_dt = datetime.fromisoformat(birth_time_str)
-                            if birth_time_dt.tzinfo is None:
-                                birth_time_dt = birth_time_dt.replace(tzinfo=ZoneInfo("Etc/GMT-1"))
+                            # It's an existing unconfirmed opportunity. Load its recorded birth time.
+                            birth_time_dt = parse_birth_time(birth_time_str)
+                        elif unconfirmed_entry is None and tracked_first_seen is not None:
+                            # It's a previously confirmed opportunity that we are tracking (epoch seconds).
+                            birth_time_dt = datetime.fromtimestamp(tracked_first_seen, tz=ZoneInfo("Etc/GMT-1"))
                         else:
                             # It's a brand new, never-before-seen opportunity.
                             # Set birth_time to the latest update timestamp from the involved sources.
-
-                            # Get involved sources based on the mode
-                            if CHECKING_MODE == "arb":
-                                involved_sources = opp.get("arbitrage_sources", "").split(", ")
-                            else:  # ev mode
-                                involved_sources = opp.get("ev_sources", [])
-
-                            source_timestamps = []
-                            for match_in_group in group:
-                                if match_in_group.get(
-                                        'source') in involved_sources and 'file_last_updated' in match_in_group:
-                                    source_timestamps.append(match_in_group['file_last_updated'])
+                            # file_last_updated is already a datetime, set when the file was loaded.
+                            if group_source_updates is None:
+                                group_source_updates = {}
+                                for match_in_group in group:
+                                    if 'file_last_updated' in match_in_group:
+                                        src = match_in_group.get('source')
+                                        updated = match_in_group['file_last_updated']
+                                        if src not in group_source_updates or updated > group_source_updates[src]:
+                                            group_source_updates[src] = updated
+
+                            source_timestamps = [
+                                group_source_updates[src] for src in set(involved_sources) if src in group_source_updates
+                            ]
 
                             if source_timestamps:
                                 birth_time_dt = max(source_timestamps)
@@ -389,30 +587,20 @@ def process_files_optimal():
                                 # Fallback to now_utc ONLY if source timestamps are missing (unlikely)
                                 birth_time_dt = now_utc
 
-                            birth_time_str = birth_time_dt.isoformat()
-
                         # 3. Check if all sources have been updated since the opportunity was born
-                        all_sources_updated = True
-
-                        # Get involved sources based on the mode
-                        if CHECKING_MODE == "arb":
-                            involved_sources = opp.get("arbitrage_sources", "").split(", ")
-                        else:  # ev mode
-                            involved_sources = opp.get("ev_sources", [])
-
-                        for src in involved_sources:
-                            # To be confirmed, a source's last update must be >= the opportunity's birth time.
-                            # So, if a source's update is < birth time, it's not confirmed yet.
-                            if src not in last_updated_times or last_updated_times[src] < birth_time_dt:
-                                all_sources_updated = False
-                                break
+                        # To be confirmed, every source's last update must be >= the opportunity's birth time,
+                        # so the oldest one decides. A source without any update time is never confirmed.
+                        source_updates = [last_updated_times.get(src) for src in involved_sources]
+                        all_sources_updated = (
+                            not source_updates or (None not in source_updates and min(source_updates) >= birth_time_dt)
+                        )
 
                         if all_sources_updated:
                             is_confirmed = True
                         else:
                             # Still waiting for confirmation, save it to the cache for the next run
                             current_unconfirmed_opps[unique_id] = {
-                                "birth_time": birth_time_str,
+                                "birth_time": birth_time_str or birth_time_dt.isoformat(),
                                 "opportunity_data": opp
                             }
 
@@ -435,22 +623,22 @@ def process_files_optimal():
 
                         current_run_unique_ids.add(unique_id)
 
-                        if unique_id in activity_data and "first_seen" in activity_data[unique_id]:
-                            # This is an existing, tracked opportunity.
-                            first_seen_str = activity_data[unique_id]["first_seen"]
-                            first_seen_dt = datetime.fromisoformat(first_seen_str)
-                            if first_seen_dt.tzinfo is None:
-                                first_seen_dt = first_seen_dt.replace(tzinfo=ZoneInfo("Etc/GMT-1"))
-                        else:
-                            # This is a brand new opportunity.
-                            first_seen_dt = birth_time_dt
-                            # The calculator may have already added info to a placeholder dict.
-                            # We must UPDATE the dict, not replace it.
-                            activity_data.setdefault(unique_id, {}).update({
-                                "first_seen": first_seen_dt.isoformat()
-                            })
+                        # The calculator may have already added info to a placeholder dict.
+                        # We must UPDATE the dict, not replace it.
+                        activity_entry = activity_data.setdefault(unique_id, {})
+                        # An existing, tracked opportunity has its first_seen (in epoch seconds).
+                        first_seen_ts = activity_entry.get("first_seen")
+                        if first_seen_ts is None:
+                            # This is a brand new opportunity, born now unless a source timestamp says otherwise.
+                            if birth_time_dt is now_utc:
+                                first_seen_ts = now_ts
+                            else:
+                                if birth_time_dt.tzinfo is None:
+                                    birth_time_dt = birth_time_dt.replace(tzinfo=ZoneInfo("Etc/GMT-1"))
+                                first_seen_ts = birth_time_dt.timestamp()
+                            activity_entry["first_seen"] = first_seen_ts
 
-                        opp["activity_duration"] = format_duration((now_utc - first_seen_dt).total_seconds())
+                        opp["activity_duration"] = format_duration(now_ts - first_seen_ts)
 
                         confirmed_opportunities.append(opp)
 
@@ -479,27 +667,21 @@ def process_files_optimal():
     if CHECKING_MODE == "ev" and ev_calculator.OVERPRICE_SOURCE_LOGGING:
         manage_ev_lifecycle(
             current_opportunities_cache=current_opportunities_cache,
-            all_match_groups_by_id=all_match_groups_by_id,
+            get_match_groups_by_id=get_match_groups_by_id,
             output_dir=OUTPUT_DIR,
-            log_output_root=log_output_root,
+            log_output_root=EV_LOG_OUTPUT_ROOT,
             activity_data=activity_data
         )
 
     # ADD THIS HELPER FUNCTION RIGHT BEFORE THE LOOP
-    def json_serializer(obj):
-        """JSON serializer for objects not serializable by default json code"""
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Type {type(obj)} not serializable")
-
     # Write results to files and export to Supabase if configured
+    write_futures = []
     for country, list_of_groups in sorted(results_by_country.items()):
         if list_of_groups:
-            # Écriture dans les fichiers JSON
+            # Écriture dans les fichiers JSON, sur les threads d'I/O
             filename = f"{country}.json"
             out_path = os.path.join(OUTPUT_DIR, filename)
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(list_of_groups, f, ensure_ascii=False, indent=2, default=json_serializer)
+            write_futures.append(IO_EXECUTOR.submit(write_country_file, out_path, list_of_groups))
             generated_files.add(filename)
             
             # Export vers Supabase si configuré
@@ -535,15 +717,14 @@ def process_files_optimal():
                 except Exception as e:
                     print(f"\n[SUPABASE] Erreur lors de l'export pour {country}: {str(e)}")
 
-    # --- Cache previous match data if needed by either mode ---
-    # EV mode needs it for its appearance investigation.
-    # Arb mode needs it if the detection method is 'appearance'.
-    should_cache_for_ev = (CHECKING_MODE == "ev" and ev_calculator.APPEARANCE_INVESTIGATION)
-    should_cache_for_arb = (CHECKING_MODE == "arb" and arb_calculator.MISVALUE_DETECTION_METHOD == "appearance")
+    # The country files must be complete before they are deduplicated and uploaded
+    for future in write_futures:
+        future.result()
 
+    # --- Cache previous match data if needed by either mode ---
     if should_cache_for_ev or should_cache_for_arb:
         os.makedirs(cache_dir, exist_ok=True)
-        save_json_to_file(PREV_MATCH_DATA_PATH, all_match_groups_by_id)
+        save_json_to_file(PREV_MATCH_DATA_PATH, get_match_groups_by_id())
         if should_cache_for_arb:
             print("[ARB_CACHE] Saved match data for next cycle's 'appearance' investigation.")
 
@@ -646,32 +827,21 @@ def process_files_optimal():
                             print(f"[PRUNE] Failed to remove {remotepath}: {resp}")
     cleanup_old_files(OUTPUT_DIR, generated_files)
 
-    # Prune activity tracker
-    unconfirmed_unique_ids = set(current_unconfirmed_opps.keys()) if SHOW_ONLY_CONFIRMED else set()
-
-    if CHECKING_MODE == "arb":
-        # For arbitrage mode, an opportunity is only tracked if it is currently
-        # active (in current_run_unique_ids) or waiting for confirmation.
-        # Once it disappears, it is removed from the tracker.
-        pruned_activity_data = {
-            uid: data
-            for uid, data in activity_data.items()
-            if (uid in current_run_unique_ids or
-                uid in unconfirmed_unique_ids)
-        }
-    else:  # This covers "ev" mode
-        # MODIFIED: Inactive EV opportunities are now removed from the tracker.
-        # The necessary state for disappearance investigations will be passed
-        # to the lifecycle manager and stored in the purgatory cache instead.
-        pruned_activity_data = {
-            uid: data
-            for uid, data in activity_data.items()
-            if (uid in current_run_unique_ids or
-                uid in unconfirmed_unique_ids)
-        }
-
-    save_activity_data(ACTIVITY_TRACKER_PATH, pruned_activity_data)
-    print(f"\nUpdated activity tracker. Tracking {len(pruned_activity_data)} active opportunities.")
+    # Prune activity tracker (only confirmation mode fills current_unconfirmed_opps)
+    unconfirmed_unique_ids = current_unconfirmed_opps.keys()
+
+    # In both modes an opportunity is only tracked if it is currently
+    # active (in current_run_unique_ids) or waiting for confirmation.
+    # Once it disappears, it is removed from the tracker.
+    # MODIFIED: Inactive EV opportunities are now removed from the tracker.
+    # The necessary state for disappearance investigations will be passed
+    # to the lifecycle manager and stored in the purgatory cache instead.
+    # The stale entries are deleted in place rather than copying the kept ones into a new dict.
+    for uid in activity_data.keys() - current_run_unique_ids - unconfirmed_unique_ids:
+        del activity_data[uid]
+
+    save_activity_data(ACTIVITY_TRACKER_PATH, activity_data)
+    print(f"\nUpdated activity tracker. Tracking {len(activity_data)} active opportunities.")
     print(f"Total matching groups: {total_matching_groups}")
 
     if CHECKING_MODE == "ev":
@@ -688,12 +858,28 @@ def process_files_optimal():
 
 
 # ----- Entry Point -----
-if LOOP:
-    while True:
-        if __name__ == "__main__":
+def start_main_process():
+    """
+    Setup only the main process needs. Pool workers re-import this module on spawn platforms and
+    run its module-level code again (arguments, settings, calculator configuration, which they need),
+    so the Supabase client, the log listener thread and the I/O threads are started here instead.
+    """
+    global supabase_exporter, IO_EXECUTOR
+    if EXPORT_TO_SUPABASE:
+        supabase_exporter = SupabaseExporter(SUPABASE_URL, SUPABASE_KEY)
+        print('[SUPABASE] Export is ENABLED')
+    else:
+        print('[SUPABASE] Export is DISABLED (SUPABASE_URL/SUPABASE_KEY not set)')
+    configure_main_logging()
+    IO_EXECUTOR = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
+
+
+if __name__ == "__main__":
+    start_main_process()
+    if LOOP:
+        while True:
             process_files_optimal()
-        print(f"\n--- Cycle complete. Waiting for {DELAY} seconds. ---\n")
-        time.sleep(DELAY)
-else:
-    if __name__ == "__main__":
+            print(f"\n--- Cycle complete. Waiting for {DELAY} seconds. ---\n")
+            time.sleep(DELAY)
+    else:
         process_files_optimal()
\ No newline at end of file
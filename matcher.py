@@ -4,9 +4,9 @@ import re
 import unicodedata
 import difflib
 from datetime import datetime
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, FrozenSet, List, Set, Any, Optional, Tuple
 from functools import lru_cache
-import json
+import orjson
 
 # ----- DEBUGGING Configuartions -----
 # Set DEBUG to True to see detailed logs for a specific match.
@@ -22,9 +22,9 @@ SWAP_PAIRS = []
 IMPORTANT_TERM_GROUPS: List[List[str]] = []
 SYN_PRIMARY: Set[str] = set()
 SYN_GROUPS: Set[str] = set()
-COMMON_TEAM_WORDS: Set[str] = set()
-LOCATION_IDENTIFIERS: Set[str] = set()
-TEAM_SYNONYMS: Set[str] = set()
+COMMON_TEAM_WORDS: FrozenSet[str] = frozenset()
+LOCATION_IDENTIFIERS: FrozenSet[str] = frozenset()
+TEAM_SYNONYMS: Tuple[FrozenSet[str], ...] = ()
 STRONG_THRESHOLD: List[float] = []
 MODERATE_THRESHOLD: List[float] = []
 TIME_DIFF_TOLERANCE: Set[int] = set()
@@ -43,6 +43,17 @@ _ROMAN_NUMERALS = [
 ]
 _ROMAN_PATTERN = re.compile(r'\b(' + '|'.join(_ROMAN_NUMERALS) + r')\b', re.IGNORECASE)
 _SUFFIX_PATTERN = re.compile(r"(ienne|ien|aise|ais|oise|ois|ine|in|é)$")
+_PHONETIC_SUBS = [
+    (re.compile(pattern), replacement) for pattern, replacement in [
+        (r"k[\'`\-\s]*un", "kun"),
+        (r"j[\'`\-\s]*in", "jin"),
+        (r"zh[\'`\-\s]*ou", "zhou"),
+        (r"([aeiou])[\'`]", r"\1"),
+        (r"saint", "st"),
+        (r"fc", ""),
+        (r"[\s\-]+", ""),
+    ]
+]
 
 
 def _log_debug(is_target: bool, *args):
@@ -143,35 +154,62 @@ def get_phonetic_representation(name: str) -> str:
         return ""
     n = normalize_team_name(name)
 
-    phonetic_subs = [
-        (r"k[\'`\-\s]*un", "kun"),
-        (r"j[\'`\-\s]*in", "jin"),
-        (r"zh[\'`\-\s]*ou", "zhou"),
-        (r"([aeiou])[\'`]", r"\1"),
-        (r"saint", "st"),
-        (r"fc", ""),
-        (r"[\s\-]+", ""),
-    ]
-
     result = n
-    for pattern, replacement in phonetic_subs:
-        result = re.sub(pattern, replacement, result)
+    for pattern, replacement in _PHONETIC_SUBS:
+        result = pattern.sub(replacement, result)
 
     return result
 
 
+# Compiled forms of IMPORTANT_TERM_GROUPS, rebuilt when main.py replaces the groups
+_terms_source: Optional[List[List[str]]] = None
+_term_patterns: Tuple[Tuple[str, re.Pattern], ...] = ()  # (lowercased term, whole-word pattern)
+_term_groups: Tuple[FrozenSet[str], ...] = ()  # lowercased terms of each group
+_term_strip_patterns: Tuple[re.Pattern, ...] = ()  # every term, in order, as used by teams_match
+
+
+def _load_important_terms():
+    """Compiles the important term patterns once per IMPORTANT_TERM_GROUPS."""
+    global _terms_source, _term_patterns, _term_groups, _term_strip_patterns
+    if _terms_source is IMPORTANT_TERM_GROUPS:
+        return
+    lowered = {term.lower() for group in IMPORTANT_TERM_GROUPS for term in group}
+    _term_patterns = tuple((term, re.compile(r'\b' + re.escape(term) + r'\b')) for term in sorted(lowered))
+    _term_groups = tuple(frozenset(term.lower() for term in group) for group in IMPORTANT_TERM_GROUPS)
+    _term_strip_patterns = tuple(
+        re.compile(r'\b' + re.escape(term) + r'\b', flags=re.IGNORECASE)
+        for group in IMPORTANT_TERM_GROUPS for term in group
+    )
+    _important_terms_in.cache_clear()
+    _strip_important_terms.cache_clear()
+    _terms_source = IMPORTANT_TERM_GROUPS
+
+
+@lru_cache(maxsize=10000)
+def _important_terms_in(name_lower: str) -> FrozenSet[str]:
+    """The (lowercased) important terms present as whole words in an already lowercased name."""
+    return frozenset(term for term, pattern in _term_patterns if pattern.search(name_lower))
+
+
+@lru_cache(maxsize=10000)
+def _strip_important_terms(name: str) -> str:
+    """Removes every important term from name as a whole word, ignoring case."""
+    for pattern in _term_strip_patterns:
+        name = pattern.sub("", name)
+    return name
+
+
 def _check_important_terms_match(team1: str, team2: str) -> bool:
     """
     Checks if two team names have a matching profile of important terms.
     For each group of synonyms (e.g., ["U21", "Youth"]), it verifies that
     either both teams contain a term from that group, or neither does.
     """
-    team1_lower = team1.lower()
-    team2_lower = team2.lower()
-    for grp in IMPORTANT_TERM_GROUPS:
-        in1 = any(re.search(r'\b' + re.escape(term.lower()) + r'\b', team1_lower) for term in grp)
-        in2 = any(re.search(r'\b' + re.escape(term.lower()) + r'\b', team2_lower) for term in grp)
-        if in1 != in2:
+    _load_important_terms()
+    terms1 = _important_terms_in(team1.lower())
+    terms2 = _important_terms_in(team2.lower())
+    for grp in _term_groups:
+        if grp.isdisjoint(terms1) != grp.isdisjoint(terms2):
             return False  # Mismatch: one has the term, the other doesn't
     return True # All term groups match
 
@@ -202,6 +240,24 @@ def simplify_team_name(name: str) -> str:
     return result.strip()
 
 
+# Whole-word alternation of every important term and standalone number, rebuilt when main.py
+# replaces IMPORTANT_TERM_GROUPS
+_core_strip_source: Optional[List[List[str]]] = None
+_core_strip_pattern: Optional[re.Pattern] = None
+
+
+def _get_core_strip_pattern() -> re.Pattern:
+    global _core_strip_source, _core_strip_pattern
+    if _core_strip_pattern is None or _core_strip_source is not IMPORTANT_TERM_GROUPS:
+        alternatives = [re.escape(term.lower()) for group in IMPORTANT_TERM_GROUPS for term in group]
+        # Numbers are only stripped along with the terms: without terms nothing is removed
+        _core_strip_pattern = re.compile(
+            r'\b(?:' + '|'.join(alternatives + [r'\d+']) + r')\b' if alternatives else r'(?!)', flags=re.IGNORECASE
+        )
+        _core_strip_source = IMPORTANT_TERM_GROUPS
+    return _core_strip_pattern
+
+
 @lru_cache(maxsize=5000)
 def get_core_name(name: str) -> str:
     """
@@ -213,18 +269,9 @@ def get_core_name(name: str) -> str:
     # Start with the simplified name (removes common words like 'fc', 'ec', etc.)
     simplified = simplify_team_name(name)
 
-    # Flatten the important term groups into a single list for easier processing
-    all_important_terms = [term for group in IMPORTANT_TERM_GROUPS for term in group]
-
-    # Remove all important terms, ignoring case
-    core_name = simplified
-    for term in all_important_terms:
-        # Use regex to remove the term as a whole word, with flexible spacing
-        # This prevents "reserve" from removing the "rese" in "Varese"
-        pattern = re.compile(r'\b' + re.escape(term.lower()) + r'\b', flags=re.IGNORECASE)
-        core_name = pattern.sub("", core_name)
-        # remove all standalone numbers
-        core_name = re.sub(r'\b\d+\b', '', core_name)
+    # Remove all important terms and standalone numbers in one pass, ignoring case.
+    # Only whole words are removed: this prevents "reserve" from removing the "rese" in "Varese"
+    core_name = _get_core_strip_pattern().sub("", simplified)
     # Clean up extra whitespace that may result from substitutions
     core_name = _WHITESPACE_PATTERN.sub(" ", core_name).strip()
     return core_name
@@ -289,7 +336,12 @@ def calculate_jaccard_score(name1: str, name2: str) -> float:
 
     # 2. Calculate a fuzzy ratio on the complete core names
     # This is excellent at catching minor differences like 'kristianstad' vs 'kristianstads'
-    fuzzy_score = difflib.SequenceMatcher(None, core1, core2).ratio()
+    # The cheap upper bounds of the ratio come first: when they can't beat the Jaccard score,
+    # the full ratio can't either and is not computed.
+    seq = difflib.SequenceMatcher(None, core1, core2)
+    if seq.real_quick_ratio() <= jaccard_score or seq.quick_ratio() <= jaccard_score:
+        return jaccard_score
+    fuzzy_score = seq.ratio()
 
     # 3. Return the higher of the two scores
     # This preserves the strength of the Jaccard method for word order
@@ -311,15 +363,17 @@ def fuzzy_match(a: str, b: str, threshold: Optional[float] = None) -> bool:
     if threshold is None:
         threshold = 0.5
 
-    return difflib.SequenceMatcher(None, a_lower, b_lower).ratio() >= threshold
+    # real_quick_ratio() and quick_ratio() are cheap upper bounds of ratio()
+    seq = difflib.SequenceMatcher(None, a_lower, b_lower)
+    return seq.real_quick_ratio() >= threshold and seq.quick_ratio() >= threshold and seq.ratio() >= threshold
 
 
 def load_swap_words(swap_words_path: str):
     """Load the swap words configuration from JSON file."""
     global SWAP_PAIRS
     try:
-        with open(swap_words_path, encoding="utf-8") as f:
-            config = json.load(f)
+        with open(swap_words_path, "rb") as f:
+            config = orjson.loads(f.read())
             SWAP_PAIRS = config.get("swap_pairs", [])
     except FileNotFoundError:
         print(f"Warning: swap_words.json not found at {swap_words_path}")
@@ -515,42 +569,28 @@ def teams_match(t1: str, t2: str) -> bool:
     # EXACT SAME LOGIC - just using cached helper functions
     if not t1 or not t2:
         return False
-    t1_lower = t1.lower()
-    t2_lower = t2.lower()
+    _load_important_terms()
+    # Terms present as whole words in each name, found once per name
+    terms1 = _important_terms_in(t1.lower())
+    terms2 = _important_terms_in(t2.lower())
 
     # 1) ENHANCED IMPORTANT-TERM PRESENCE CHECK (CORRECTED)
-    def check_presence(source_lower: str, target_lower: str) -> bool:
-        # Find all terms present as whole words in the source string
-        present_terms = {
-            term.lower() for group in IMPORTANT_TERM_GROUPS for term in group
-            if re.search(r'\b' + re.escape(term.lower()) + r'\b', source_lower)
-        }
-
-        if not present_terms:
+    def check_presence(source_terms: FrozenSet[str], target_terms: FrozenSet[str]) -> bool:
+        if not source_terms:
             return True  # No important terms in source, so no restriction on target.
 
-        # Gather all synonym groups for the terms we found.
-        relevant_groups = [
-            group for group in IMPORTANT_TERM_GROUPS
-            if any(term.lower() in present_terms for term in group)
-        ]
-        # Combine all synonyms from those relevant groups into one set.
-        combined_terms = {term.lower() for group in relevant_groups for term in group}
+        # Combine all synonyms from the groups of the terms we found into one set.
+        combined_terms = frozenset().union(*(group for group in _term_groups if not group.isdisjoint(source_terms)))
 
         # Ensure at least one of the synonyms appears as a whole word in the target.
-        return any(re.search(r'\b' + re.escape(term) + r'\b', target_lower) for term in combined_terms)
+        return not combined_terms.isdisjoint(target_terms)
 
-    if not (check_presence(t1_lower, t2_lower) and check_presence(t2_lower, t1_lower)):
+    if not (check_presence(terms1, terms2) and check_presence(terms2, terms1)):
         return False
 
     # 2) STRIP IMPORTANT TERMS FOR COMPARISON ONLY (CORRECTED)
-    comp1, comp2 = t1, t2
-    all_important_terms = [term for group in IMPORTANT_TERM_GROUPS for term in group]
-    for term in all_important_terms:
-        # Use word boundaries (\b) to ensure only whole words are removed
-        pattern = re.compile(r'\b' + re.escape(term) + r'\b', flags=re.IGNORECASE)
-        comp1 = pattern.sub("", comp1)
-        comp2 = pattern.sub("", comp2)
+    # Word boundaries (\b) ensure only whole words are removed
+    comp1, comp2 = _strip_important_terms(t1), _strip_important_terms(t2)
 
     # 3) NORMALIZE AND COMPARE (No changes from here onwards in this function)
     n1 = normalize_team_name(comp1)
@@ -641,6 +681,55 @@ def parse_date(date_str: str) -> Optional[datetime.date]:
     return None
 
 
+@lru_cache(maxsize=2000)
+def parse_time_minutes(time_str: str) -> Optional[int]:
+    """
+    Parse an "HH:MM" kick-off time into minutes since midnight.
+    Returns None if parsing fails.
+    """
+    try:
+        t = datetime.strptime(time_str, "%H:%M")
+    except ValueError:
+        return None
+    return t.hour * 60 + t.minute
+
+
+def _kickoff_key(m: Dict[str, Any]) -> Tuple[Optional[int], Optional[int], str]:
+    """(date ordinal, minutes since midnight, stripped time string) of a match, parsed once per match."""
+    d = parse_date(m.get('date', ''))
+    t = m.get('time', '').strip()
+    return (d.toordinal() if d else None), parse_time_minutes(t), t
+
+
+def _kickoffs_close(k1: Tuple[Optional[int], Optional[int], str], k2: Tuple[Optional[int], Optional[int], str]) -> bool:
+    """The time guard: kick-offs within TIME_DIFF_TOLERANCE minutes, or identical unparseable times."""
+    if k1[1] is not None and k2[1] is not None:
+        return abs(k1[1] - k2[1]) <= TIME_DIFF_TOLERANCE
+    return k1[2] == k2[2]
+
+
+def _index_by_day(keys: List[Tuple[Optional[int], Optional[int], str]]) -> Dict[int, List[int]]:
+    """Positions of a source's matches grouped by kick-off day, in list order. Undated matches are left out."""
+    index: Dict[int, List[int]] = {}
+    for i, key in enumerate(keys):
+        if key[0] is not None:
+            index.setdefault(key[0], []).append(i)
+    return index
+
+
+def _same_days(day_index: Dict[int, List[int]], day: Optional[int]) -> List[int]:
+    """
+    Positions, in list order, of the matches whose day is within DAY_DIFF_TOLERANCE of day:
+    the only ones the date guard lets through.
+    """
+    if day is None:
+        return []
+    tolerance = int(DAY_DIFF_TOLERANCE)
+    if not tolerance:
+        return day_index.get(day, [])
+    return sorted(i for d in range(day - tolerance, day + tolerance + 1) for i in day_index.get(d, ()))
+
+
 def find_all_matching_matches(
         matches_by_source: Dict[str, List[Dict[str, Any]]]
 ) -> List[List[Dict[str, Any]]]:
@@ -677,9 +766,15 @@ def find_all_matching_matches(
                     processed[m['source']].add(str(m['match_id']))
                 groups.append(bucket)
 
+    # Blocking: the date and time of every match are parsed once, and each source's matches are
+    # grouped by day, so the date guard only ever sees candidates of the allowed days.
+    kickoffs = {src: [_kickoff_key(m) for m in matches_by_source[src]] for src in sources}
+    day_indexes = {src: _index_by_day(kickoffs[src]) for src in sources}
+
     # STEP 2: Fuzzy matching with symmetric best-match check and reverse checking
     for src1 in sources:
-        for m1 in matches_by_source[src1]:
+        src1_matches = matches_by_source[src1]
+        for k1, m1 in zip(kickoffs[src1], src1_matches):
             m1.setdefault("source", src1)
             mid1 = str(m1['match_id'])
             if mid1 in processed[src1]:
@@ -706,28 +801,18 @@ def find_all_matching_matches(
                 best_is_reversed = False  # Track if best match needs reversal
 
                 # 1 - Forward search: find best candidate in src2 for m1
-                for m2 in matches_by_source[src2]:
+                src2_matches, src2_kickoffs = matches_by_source[src2], kickoffs[src2]
+                # Date guard: only the src2 matches of the allowed days
+                for i2 in _same_days(day_indexes[src2], k1[0]):
+                    m2 = src2_matches[i2]
                     m2.setdefault("source", src2)
                     mid2 = str(m2['match_id'])
                     if mid2 in processed[src2]:
                         continue
 
-                    # Date guard
-                    d1 = parse_date(m1.get('date', ''))
-                    d2 = parse_date(m2.get('date', ''))
-                    if not d1 or not d2 or abs((d1 - d2).days) > DAY_DIFF_TOLERANCE:
-                        continue
-
                     # Time guard
-                    t1, t2 = m1.get('time', '').strip(), m2.get('time', '').strip()
-                    try:
-                        dt1 = datetime.strptime(t1, "%H:%M")
-                        dt2 = datetime.strptime(t2, "%H:%M")
-                        if abs((dt1 - dt2).total_seconds()) / 60 > TIME_DIFF_TOLERANCE:
-                            continue
-                    except ValueError:
-                        if t1 != t2:
-                            continue
+                    if not _kickoffs_close(k1, src2_kickoffs[i2]):
+                        continue
 
                     # Calculate normal comparison scores
                     home_score_normal = (
@@ -796,6 +881,7 @@ def find_all_matching_matches(
                     if avg_score > best_score:
                         best_score = avg_score
                         best_match = m2
+                        best_index = i2
                         best_is_reversed = use_reversed
 
                 if not best_match:
@@ -804,23 +890,14 @@ def find_all_matching_matches(
                 # 2 - Reverse search: verify best_match also prefers m1 over alternatives
                 reverse_best = None
                 reverse_score = 0.0
-                for m1b in matches_by_source[src1]:
+                best_kickoff = src2_kickoffs[best_index]
+                # Date guard: only the src1 matches of the allowed days
+                for i1b in _same_days(day_indexes[src1], best_kickoff[0]):
+                    m1b = src1_matches[i1b]
                     m1b.setdefault("source", src1)
-                    # Date guard
-                    d1b = parse_date(m1b.get('date', ''))
-                    d2b = parse_date(best_match.get('date', ''))
-                    if not d1b or not d2b or abs((d1b - d2b).days) > DAY_DIFF_TOLERANCE:
-                        continue
                     # Time guard
-                    tb1, tb2 = m1b.get('time', '').strip(), best_match.get('time', '').strip()
-                    try:
-                        dtb1 = datetime.strptime(tb1, "%H:%M")
-                        dtb2 = datetime.strptime(tb2, "%H:%M")
-                        if abs((dtb1 - dtb2).total_seconds()) / 60 > TIME_DIFF_TOLERANCE:
-                            continue
-                    except ValueError:
-                        if tb1 != tb2:
-                            continue
+                    if not _kickoffs_close(kickoffs[src1][i1b], best_kickoff):
+                        continue
 
                     # Use the same logic for reverse verification
                     if best_is_reversed:
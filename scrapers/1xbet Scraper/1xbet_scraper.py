@@ -200,8 +200,8 @@ def get_country_leagues(session):
     with open('settings/known_countries.json', 'r', encoding='utf-8') as f:
         known_countries = json.load(f)
 
-    multi_league = {item.get("L") for item in r.json().get("Value", []) if item.get("SC")}
-    for item in r.json().get("Value", []) or []:
+    items = r.json().get("Value") or []
+    for item in items:
         raw = item.get("L", "Unknown")
         if item.get("SC"):
             country_map[raw] = raw
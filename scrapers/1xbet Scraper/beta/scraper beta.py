@@ -1,11 +1,16 @@
 import os
 import json
 import time
+import orjson
+import random
 import datetime
+import argparse
+import threading
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from requests.exceptions import HTTPError
+from urllib3.util.request import ACCEPT_ENCODING
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Directory to save scraped JSON files
 OUTPUT_DIR = "scraped_matches"
@@ -17,6 +22,8 @@ ODDS_URL = "https://1xbet.com/service-api/LineFeed/Get1x2_VZip"
 # Base headers for championships request
 BASE_HEADERS = {
     "Accept": "application/json, text/plain, */*",
+    # gzip/deflate, plus br/zstd when brotli/zstandard are installed and can be decoded
+    "Accept-Encoding": ACCEPT_ENCODING,
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
     "X-Requested-With": "XMLHttpRequest",
     "X-Svc-Source": "__BETTING_APP__",
@@ -50,34 +57,157 @@ ODDS_PARAMS = {
 # Timeout for HTTP requests (seconds)
 REQUEST_TIMEOUT = 10
 
+# Output keys of the mainline 1X2 and Double Chance events, indexed by T - 1
+MAINLINE_KEYS = ("1_odd", "draw_odd", "2_odd", "1X_odd", "12_odd", "2X_odd")
+
+# Match times are written in UTC+1 (Tunisia)
+TZ_PLUS1 = datetime.timezone(datetime.timedelta(hours=1))
+
+# On-disk cache of the championships list, reused while younger than the TTL (seconds)
+CHAMPS_CACHE_PATH = "_champs_cache.json"
+CHAMPS_CACHE_TTL = 600
+
+# -------------- Performance Configuration ----------------------------------------------
+MAX_WORKERS = 16  # Number of parallel threads fetching leagues, kept below POOL_SIZE.
+POOL_SIZE = 32  # Keep-alive connections held by the shared session's HTTPAdapter.
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}  # Statuses that make the limiter back off.
+RETRY_ATTEMPTS = 5  # Retries per league request by urllib3's Retry (attempts in the async scraper's loop).
+BACKOFF_BASE = 0.5  # Seconds; retry n waits up to BACKOFF_BASE * 2**n (capped at BACKOFF_MAX).
+BACKOFF_MAX = 60
+# ----------------------------------------------------------------------------------------
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter, so throttled threads do not retry in lockstep."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class AimdLimiter:
+    """
+    Additive-increase / multiplicative-decrease cap on in-flight requests.
+    Each success raises the limit by `alpha`, each throttled or failed response
+    multiplies it by `beta` and pauses new requests for the server's Retry-After
+    (or `default_cooldown` seconds when the header is missing). Errors seen during a
+    pause belong to the same throttling burst and only extend the pause.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.5, c_min=1, c_max=MAX_WORKERS, default_cooldown=5.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.c_min = c_min
+        self.c_max = c_max
+        self.default_cooldown = default_cooldown
+        self.limit = float(c_max)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while True:
+                pause = self.blocked_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+        return False
+
+    def on_success(self):
+        with self._cond:
+            self.limit = min(self.c_max, self.limit + self.alpha)
+            self._cond.notify_all()
+
+    def on_error(self, retry_after=None):
+        try:
+            cooldown = float(retry_after)
+        except (TypeError, ValueError):
+            cooldown = self.default_cooldown
+        with self._cond:
+            now = time.monotonic()
+            if now >= self.blocked_until:
+                self.limit = max(self.c_min, self.limit * self.beta)
+                print(f"    Throttled, concurrency limit now {int(self.limit)}, pausing {cooldown:.1f}s")
+            self.blocked_until = max(self.blocked_until, now + cooldown)
+
+
+LIMITER = AimdLimiter()
+
+
+class LimiterRetry(Retry):
+    """
+    urllib3 retries throttled responses internally and never hands them back,
+    so the limiter is told about each one here, before the retry is scheduled.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and response.status in RETRY_STATUSES:
+            LIMITER.on_error(response.headers.get("Retry-After"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
 
 def create_session_with_retries():
     session = requests.Session()
     session.headers.update(BASE_HEADERS)
 
-    retry_strategy = Retry(
-        total=10,
-        backoff_factor=0.01,
-        status_forcelist=[429, 500, 502, 503, 504, 529],
+    retry_strategy = LimiterRetry(
+        total=RETRY_ATTEMPTS,
+        backoff_factor=BACKOFF_BASE,
+        backoff_jitter=1.0,
+        respect_retry_after_header=True,
+        status_forcelist=sorted(RETRY_STATUSES),
         allowed_methods=["GET", "HEAD", "OPTIONS"]
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    # pool_block makes extra threads wait for a warm connection instead of opening throwaway ones
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, pool_block=True
+    )
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
 
 
-def get_country_leagues(session):
-    r = session.get(CHAMPS_URL, params=CHAMPS_PARAMS, timeout=REQUEST_TIMEOUT)
-    r.raise_for_status()
+def load_cached_champs():
+    """Returns the cached championships payload, or None if missing, stale or for other params."""
+    try:
+        with open(CHAMPS_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if cache.get("params") != CHAMPS_PARAMS or time.time() - cache.get("ts", 0) >= CHAMPS_CACHE_TTL:
+        return None
+    return cache.get("payload")
+
+
+def save_cached_champs(payload):
+    with open(CHAMPS_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"ts": time.time(), "params": CHAMPS_PARAMS, "payload": payload}, f, ensure_ascii=False)
+
+
+def get_country_leagues(session, refresh=False):
+    payload = None if refresh else load_cached_champs()
+    if payload is None:
+        r = session.get(CHAMPS_URL, params=CHAMPS_PARAMS, timeout=REQUEST_TIMEOUT)
+        r.raise_for_status()
+        payload = orjson.loads(r.content).get("Value") or []
+        save_cached_champs(payload)
+
     leagues = {}
     country_map = {}
     known_countries = [
         # ... list truncated for brevity ...
     ]
 
-    multi_league = {item.get("L") for item in r.json().get("Value", []) if item.get("SC")}
-    for item in r.json().get("Value", []) or []:
+    multi_league = {item.get("L") for item in payload if item.get("SC")}
+    for item in payload:
         raw = item.get("L", "Unknown")
         if item.get("SC"):
             country_map[raw] = raw
@@ -97,32 +227,50 @@ def get_country_leagues(session):
     return leagues, country_map
 
 
-def get_matches_for_league(session, champs_id):
+def build_league_request(champs_id, user_agent):
+    """Returns the (params, headers) pair for a league odds request."""
     headers = {
         "Accept": "*/*",
-        "User-Agent": session.headers.get("User-Agent"),
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "User-Agent": user_agent,
         "X-Requested-With": "XMLHttpRequest",
         "Referer": f"https://1xbet.com/en/line/football/{champs_id}",
     }
     params = ODDS_PARAMS.copy()
     params["champs"] = str(champs_id)
+    return params, headers
+
+
+def get_matches_for_league(session, champs_id):
+    params, headers = build_league_request(champs_id, session.headers.get("User-Agent"))
 
-    resp = session.get(ODDS_URL, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+    with LIMITER:
+        resp = session.get(ODDS_URL, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+    # Throttled responses were already reported to the limiter by LimiterRetry
+    if resp.ok:
+        LIMITER.on_success()
     resp.raise_for_status()
-    data = resp.json().get("Value") or []
+    return parse_league_matches(orjson.loads(resp.content))
+
+
+def parse_league_matches(payload):
+    """
+    Parses the decoded body of a league odds response into match dicts.
+    Pure function, shared by the sync and async scrapers.
+    """
+    data = payload.get("Value") or []
 
     matches = []
     for m in data:
         ts = m.get("S")
         if ts is None:
             continue
-        dt_utc = datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
-        dt_loc = dt_utc.astimezone(datetime.timezone(datetime.timedelta(hours=1)))
+        dt_loc = datetime.datetime.fromtimestamp(ts, TZ_PLUS1)
 
         match = {
             "match_id": m.get("CI"),
-            "date": dt_loc.strftime("%d/%m/%Y"),
-            "time": dt_loc.strftime("%H:%M"),
+            "date": f"{dt_loc.day:02d}/{dt_loc.month:02d}/{dt_loc.year:04d}",
+            "time": f"{dt_loc.hour:02d}:{dt_loc.minute:02d}",
             "home_team": m.get("O1"),
             "away_team": m.get("O2"),
         }
@@ -141,12 +289,8 @@ def get_matches_for_league(session, champs_id):
             g = ev.get("G")
 
             # Mainline 1X2 and Double Chance (T=1-6)
-            if t in range(1, 7):
-                key_map = {
-                    1: "1_odd", 2: "draw_odd", 3: "2_odd",
-                    4: "1X_odd", 5: "12_odd", 6: "2X_odd"
-                }
-                match[key_map[t]] = c
+            if t is not None and 1 <= t <= 6:
+                match[MAINLINE_KEYS[t - 1]] = c
 
             # Both Teams To Score (group 19)
             elif g == 19:
@@ -164,59 +308,82 @@ def get_matches_for_league(session, champs_id):
             # Asian/Total Handicap (T=7 Home, T=8 Away)
             elif t in (7, 8):
                 side = "home" if t == 7 else "away"
-                base = float(p)
-                match[f"{side}_handicap_{base:.1f}_odd"] = c
+                match[f"{side}_handicap_{p:.1f}_odd"] = c
 
         matches.append(match)
     return matches
 
 
-def fetch_with_manual_retry(session, lid, name):
-    for attempt in range(2):
-        try:
-            return get_matches_for_league(session, lid)
-        except HTTPError as e:
-            if e.response is not None and e.response.status_code == 529:
-                wait = 5 * (attempt + 1)
-                print(f"    529 for {name}, retrying in {wait}s...")
-                time.sleep(wait)
-                continue
-            raise
-    raise HTTPError(f"Persistent 529 for league {lid}")
-
-
-def main():
+def fetch_league_data(session, clean, league):
+    """
+    Wrapper function to fetch data for a single league.
+    This is designed to be called concurrently by the ThreadPoolExecutor.
+    """
+    lid = league.get("id")
+    name = league.get("name")
+    try:
+        # Throttled responses (529 included) are retried by the session's LimiterRetry
+        matches = get_matches_for_league(session, lid)
+    except Exception as e:
+        print(f"Fetching {clean} - {name} ({lid})… skipped ({e})")
+        return None
+    print(f"Fetching {clean} - {name} ({lid})… {len(matches)} matches")
+    return {"tournament_id": lid, "tournament_name": name, "matches": matches}
+
+
+def save_country_file(clean, output):
+    """Writes the tournaments scraped for one country to OUTPUT_DIR."""
+    if not output:
+        print(f"No data for {clean}, skipping.")
+        return
+
+    safe = clean.replace('&', 'and').replace('/', '_')
+    path = os.path.join(OUTPUT_DIR, f"{safe}.json")
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    print(f"Saved {safe}.json")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='1xbet beta odds scraper')
+    parser.add_argument('--refresh-champs', action='store_true',
+                        help=f'Ignore the cached championships list (TTL: {CHAMPS_CACHE_TTL}s)')
+    return parser.parse_args()
+
+
+def main(refresh_champs=False):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     session = create_session_with_retries()
 
-    leagues_by_country, country_map = get_country_leagues(session)
-
-    sleep_time = 0.01
-    for raw, leagues in leagues_by_country.items():
-        clean = country_map.get(raw, raw)
-        output = []
-        for league in leagues:
-            lid = league.get("id")
-            name = league.get("name")
-            print(f"Fetching {clean} - {name} ({lid})…", end=" ")
-            try:
-                matches = fetch_with_manual_retry(session, lid, name)
-            except Exception as e:
-                print(f"skipped ({e})")
-                continue
-            print(f"{len(matches)} matches")
-            output.append({"tournament_id": lid, "tournament_name": name, "matches": matches})
-            time.sleep(sleep_time)
-
-        if not output:
-            print(f"No data for {clean}, skipping.")
-            continue
+    leagues_by_country, country_map = get_country_leagues(session, refresh=refresh_champs)
+
+    # Flatten to (raw, clean, league) so every league can be fetched concurrently
+    tasks = [
+        (raw, country_map.get(raw, raw), league)
+        for raw, leagues in leagues_by_country.items()
+        for league in leagues
+    ]
+
+    # Results are keyed by task position so each country file keeps the league order
+    results = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_league_data, session, clean, league): pos
+            for pos, (_, clean, league) in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            tournament_data = future.result()
+            if tournament_data:
+                results[futures[future]] = tournament_data
+
+    output_by_country = {}
+    for pos, (raw, clean, _) in enumerate(tasks):
+        output = output_by_country.setdefault(raw, (clean, []))[1]
+        if pos in results:
+            output.append(results[pos])
 
-        safe = clean.replace('&', 'and').replace('/', '_')
-        path = os.path.join(OUTPUT_DIR, f"{safe}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=4)
-        print(f"Saved {safe}.json")
+    for raw, (clean, output) in output_by_country.items():
+        save_country_file(clean, output)
 
 if __name__ == "__main__":
-    main()
+    main(refresh_champs=parse_arguments().refresh_champs)
@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import importlib
+import httpx
+import orjson
+
+# Reuse the endpoints, request builders and parsers of the sync beta scraper
+beta = importlib.import_module("scraper beta")
+
+# -------------- Performance Configuration ----------------------------------------------
+MAX_CONCURRENCY = 16  # Upper bound of the limiter's cap on league requests in flight.
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 32
+# ----------------------------------------------------------------------------------------
+
+
+class AsyncAimdLimiter(beta.AimdLimiter):
+    """
+    The sync scraper's AIMD limiter for coroutines: the same limit, cooldown and
+    on_success/on_error, but requests wait on an asyncio.Condition instead of blocking the loop.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._async_cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._async_cond:
+            while True:
+                pause = self.blocked_until - time.monotonic()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._async_cond.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                elif self.in_flight >= int(self.limit):
+                    await self._async_cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._async_cond:
+            self.in_flight -= 1
+            self._async_cond.notify_all()
+        return False
+
+
+async def fetch_league(client, limiter, lid, name):
+    params, headers = beta.build_league_request(lid, beta.BASE_HEADERS["User-Agent"])
+    for attempt in range(beta.RETRY_ATTEMPTS):
+        async with limiter:
+            resp = await client.get(beta.ODDS_URL, params=params, headers=headers, timeout=beta.REQUEST_TIMEOUT)
+            # Reported before the slot is released, so waiting requests see the new limit
+            if resp.status_code in beta.RETRY_STATUSES:
+                limiter.on_error(resp.headers.get("Retry-After"))
+            elif resp.is_success:
+                limiter.on_success()
+        if resp.status_code in beta.RETRY_STATUSES and attempt < beta.RETRY_ATTEMPTS - 1:
+            # The next attempt also waits for the limiter's cooldown (Retry-After)
+            wait = beta.backoff_delay(attempt)
+            print(f"    {resp.status_code} for {name}, retrying in {wait:.1f}s...")
+            await asyncio.sleep(wait)
+            continue
+        resp.raise_for_status()
+        return beta.parse_league_matches(orjson.loads(resp.content))
+
+
+async def fetch_league_data(client, limiter, clean, league):
+    """
+    Wrapper coroutine to fetch data for a single league.
+    The limiter caps how many league requests are in flight, and backs off when throttled.
+    """
+    lid = league.get("id")
+    name = league.get("name")
+    try:
+        matches = await fetch_league(client, limiter, lid, name)
+    except Exception as e:
+        print(f"Fetching {clean} - {name} ({lid})… skipped ({e})")
+        return None
+    print(f"Fetching {clean} - {name} ({lid})… {len(matches)} matches")
+    return {"tournament_id": lid, "tournament_name": name, "matches": matches}
+
+
+async def main(refresh_champs=False):
+    os.makedirs(beta.OUTPUT_DIR, exist_ok=True)
+
+    # The championship list is a single (cached) request, the sync session is enough for it
+    leagues_by_country, country_map = beta.get_country_leagues(
+        beta.create_session_with_retries(), refresh=refresh_champs
+    )
+
+    tasks = [
+        (raw, country_map.get(raw, raw), league)
+        for raw, leagues in leagues_by_country.items()
+        for league in leagues
+    ]
+
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+    limiter = AsyncAimdLimiter(c_max=MAX_CONCURRENCY)
+    async with httpx.AsyncClient(http2=True, limits=limits, headers=beta.BASE_HEADERS) as client:
+        results = await asyncio.gather(
+            *(fetch_league_data(client, limiter, clean, league) for _, clean, league in tasks)
+        )
+
+    # gather keeps submission order, so each country file keeps the league order
+    output_by_country = {}
+    for (raw, clean, _), tournament_data in zip(tasks, results):
+        output = output_by_country.setdefault(raw, (clean, []))[1]
+        if tournament_data:
+            output.append(tournament_data)
+
+    for raw, (clean, output) in output_by_country.items():
+        beta.save_country_file(clean, output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(refresh_champs=beta.parse_arguments().refresh_champs))
@@ -1,7 +1,7 @@
 # utils.py
 
 import os
-import json
+import orjson
 from collections import defaultdict
 
 from matcher import (
@@ -21,9 +21,9 @@ def dedupe_country_file(country_fn: str) -> int:
     Returns the number of removed opportunities.
     """
     try:
-        with open(country_fn, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        with open(country_fn, "rb") as f:
+            data = orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
         return 0
 
     if not isinstance(data, list):
@@ -97,8 +97,8 @@ def dedupe_country_file(country_fn: str) -> int:
         for group in final_list_to_save:
             group['opportunities'].sort(key=lambda o: o[sort_key], reverse=sort_reverse)
 
-        with open(country_fn, "w", encoding="utf-8") as f:
-            json.dump(final_list_to_save, f, indent=2, ensure_ascii=False)
+        with open(country_fn, "wb") as f:
+            f.write(orjson.dumps(final_list_to_save))
         print(f"[INFO] {os.path.basename(country_fn)}: removed {removed} duplicate opportunities")
     else:
         # If nothing was removed, we still need to remove the temp tag